@@ -1,19 +1,35 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
+from typing import AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from App.database import get_db
 from App.core.logger import log_action
+from App.core.security import PBKDF2_ROUNDS, describe_password_hash, password_needs_rehash
 from App.dependencies import require_admin
 from App.models.balance import Balance
 from App.models.queue import WithdrawalQueue
 from App.models.transaction import Transaction
 from App.models.user import User
-from App.schemas.queue import WithdrawalCompleteIn, WithdrawalQueueOut, WithdrawalReviewIn
+from App.schemas.queue import (
+    WithdrawalBatchCompleteIn,
+    WithdrawalBatchResultOut,
+    WithdrawalBatchReviewIn,
+    WithdrawalCompleteIn,
+    WithdrawalQueueOut,
+    WithdrawalReviewIn,
+)
+from App.services.password_hasher import password_hasher
+from App.utils.pagination import newest_first, page
 
 router = APIRouter()
 
@@ -24,21 +40,111 @@ class CreditRequest(BaseModel):
     amount: Decimal
 
 
+EXPORT_CHUNK_ROWS = 1000
+TRANSACTION_FIELDS = ("id", "user_id", "coin", "amount", "type", "status", "created_at")
+# action -> (required status, new status) for a withdrawal request and its ledger row.
+WITHDRAWAL_TRANSITIONS = {
+    "approve": ("pending", "approved"),
+    "reject": ("pending", "rejected"),
+    "complete": ("approved", "completed"),
+}
+
+
+def _transaction_row(tx) -> dict:
+    return {
+        "id": tx.id,
+        "user_id": tx.user_id,
+        "coin": tx.coin,
+        "amount": str(tx.amount),
+        "type": tx.type,
+        "status": tx.status,
+        "created_at": tx.created_at.isoformat(),
+    }
+
+
+async def _export_transactions(db: AsyncSession, stmt, fmt: str) -> AsyncIterator[str]:
+    # The dependency has already closed this session by the time the body streams; it reopens
+    # on first use and is closed again here.
+    try:
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=TRANSACTION_FIELDS)
+            writer.writeheader()
+            yield buffer.getvalue()
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        async for rows in result.partitions():
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=TRANSACTION_FIELDS)
+                writer.writerows(_transaction_row(tx) for tx in rows)
+                yield buffer.getvalue()
+            else:
+                yield "".join(json.dumps(_transaction_row(tx)) + "\n" for tx in rows)
+    finally:
+        await db.close()
+
+
 @router.get("/transactions")
-async def get_all_transactions(db: AsyncSession = Depends(get_db), current_user: User = Depends(require_admin)):
-    result = await db.execute(select(Transaction).order_by(Transaction.created_at.desc()))
-    txs = result.scalars().all()
-    return [
-        {
-            "id": tx.id,
-            "user_id": tx.user_id,
-            "coin": tx.coin,
-            "amount": str(tx.amount),
-            "type": tx.type,
-            "status": tx.status,
-        }
-        for tx in txs
-    ]
+async def get_all_transactions(
+    response: Response,
+    user_id: int | None = None,
+    coin: str | None = None,
+    type: str | None = None,
+    status: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """Newest first. JSON pages carry the next page's cursor in X-Next-Cursor; ndjson/csv stream every match."""
+    columns = [getattr(Transaction, field) for field in TRANSACTION_FIELDS]
+    stmt = select(*columns)
+    if user_id is not None:
+        stmt = stmt.where(Transaction.user_id == user_id)
+    if coin is not None:
+        stmt = stmt.where(Transaction.coin == coin.upper())
+    if type is not None:
+        stmt = stmt.where(Transaction.type == type)
+    if status is not None:
+        stmt = stmt.where(Transaction.status == status)
+    stmt = newest_first(stmt, Transaction.created_at, Transaction.id, cursor)
+
+    if format != "json":
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+        return StreamingResponse(
+            _export_transactions(db, stmt, format),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+        )
+
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = page(result.all(), limit, response)
+    return [_transaction_row(tx) for tx in rows]
+
+
+@router.get("/password_hashes")
+async def password_hash_report(db: AsyncSession = Depends(get_db), current_user: User = Depends(require_admin)):
+    """Stored hashes by scheme and rounds, and how many will be rehashed on their owner's next login."""
+    schemes: dict[str, dict] = {}
+    total = needs_rehash = 0
+    result = await db.stream(select(User.hashed_password).execution_options(yield_per=EXPORT_CHUNK_ROWS))
+    async for hashed_password in result.scalars():
+        scheme, rounds = describe_password_hash(hashed_password)
+        entry = schemes.setdefault(scheme, {"count": 0, "rounds": {}})
+        entry["count"] += 1
+        if rounds is not None:
+            entry["rounds"][str(rounds)] = entry["rounds"].get(str(rounds), 0) + 1
+        total += 1
+        needs_rehash += password_needs_rehash(hashed_password)
+    return {
+        "total": total,
+        "needs_rehash": needs_rehash,
+        "schemes": schemes,
+        "target": {"scheme": "pbkdf2_sha256", "rounds": PBKDF2_ROUNDS},
+        "rehashed_since_start": password_hasher.rehashed,
+        "hashing": password_hasher.run_time.summary(),
+    }
 
 
 @router.post("/credit")
@@ -61,93 +167,184 @@ async def manual_credit(payload: CreditRequest, db: AsyncSession = Depends(get_d
     return {"message": "Balance credited"}
 
 
-@router.get("/withdrawals", response_model=list[WithdrawalQueueOut])
-async def list_withdrawal_queue(db: AsyncSession = Depends(get_db), current_user: User = Depends(require_admin)):
-    result = await db.execute(select(WithdrawalQueue).order_by(WithdrawalQueue.created_at.asc()))
-    return list(result.scalars().all())
+async def _withdrawal_transaction(db: AsyncSession, item: WithdrawalQueue, status: str) -> Transaction | None:
+    """The ledger row behind a withdrawal request, by primary key.
 
+    Requests from before transaction_id existed, and not paired by the backfill,
+    fall back to matching on user, coin, amount and status; the match is then linked.
+    """
+    if item.transaction_id is not None:
+        return await db.get(Transaction, item.transaction_id)
 
-@router.post("/withdrawals/{withdrawal_id}/approve", response_model=WithdrawalQueueOut)
-async def approve_withdrawal(
-    withdrawal_id: int,
-    payload: WithdrawalReviewIn,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_admin),
-):
-    item = await db.get(WithdrawalQueue, withdrawal_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Withdrawal request not found")
-    if item.status != "pending":
-        raise HTTPException(status_code=409, detail="Only pending requests can be approved")
-
-    item.status = "approved"
-    item.note = payload.note
-    item.reviewed_at = datetime.now(timezone.utc)
-
-    tx_result = await db.execute(
+    result = await db.execute(
         select(Transaction)
+        .outerjoin(WithdrawalQueue, WithdrawalQueue.transaction_id == Transaction.id)
         .where(
+            WithdrawalQueue.id.is_(None),
             Transaction.user_id == item.user_id,
             Transaction.coin == item.coin,
             Transaction.amount == item.amount,
             Transaction.type == "withdrawal",
-            Transaction.status == "pending",
+            Transaction.status == status,
         )
         .order_by(Transaction.created_at.desc())
     )
-    tx = tx_result.scalars().first()
-    if tx:
-        tx.status = "approved"
+    tx = result.scalars().first()
+    if tx is not None:
+        item.transaction_id = tx.id
+    return tx
+
+
+@router.get("/withdrawals", response_model=list[WithdrawalQueueOut])
+async def list_withdrawal_queue(db: AsyncSession = Depends(get_db), current_user: User = Depends(require_admin)):
+    result = await db.execute(select(WithdrawalQueue).order_by(WithdrawalQueue.created_at.asc()))
+    return list(result.scalars().all())
+
+
+@dataclass
+class _Reviewed:
+    withdrawal_id: int
+    item: WithdrawalQueue | None = None
+    status_code: int | None = None
+    error: str | None = None
+    audit: dict | None = None
+
+
+async def _review_withdrawals(
+    db: AsyncSession, ids: list[int], action: str, note: str | None = None, tx_hashes: dict[int, str | None] | None = None
+) -> list[_Reviewed]:
+    """Move each request through `action` and its ledger row with it, without committing.
+
+    One query loads every request and one loads the linked transactions; requests in the
+    wrong state or not found are reported and skipped. Applied outcomes carry the audit
+    details, which the caller logs once the transaction has committed.
+    """
+    from_status, to_status = WITHDRAWAL_TRANSITIONS[action]
+    ids = list(dict.fromkeys(ids))
+    result = await db.execute(select(WithdrawalQueue).where(WithdrawalQueue.id.in_(ids)).with_for_update())
+    by_id = {item.id: item for item in result.scalars().all()}
+
+    outcomes = []
+    for withdrawal_id in ids:
+        item = by_id.get(withdrawal_id)
+        if item is None:
+            outcomes.append(_Reviewed(withdrawal_id, status_code=404, error="Withdrawal request not found"))
+        elif item.status != from_status:
+            outcomes.append(_Reviewed(withdrawal_id, item, 409, f"Only {from_status} requests can be {to_status}"))
+        else:
+            outcomes.append(_Reviewed(withdrawal_id, item))
+    accepted = [o.item for o in outcomes if o.error is None]
+    if not accepted:
+        return outcomes
+
+    linked_ids = [item.transaction_id for item in accepted if item.transaction_id is not None]
+    transactions = {}
+    if linked_ids:
+        tx_result = await db.execute(select(Transaction).where(Transaction.id.in_(linked_ids)))
+        transactions = {tx.id: tx for tx in tx_result.scalars().all()}
+
+    balances = {}
+    if action == "reject":
+        balance_result = await db.execute(
+            select(Balance).where(Balance.user_id.in_({item.user_id for item in accepted}), Balance.coin.in_({item.coin for item in accepted}))
+        )
+        balances = {(b.user_id, b.coin): b for b in balance_result.scalars().all()}
+
+    now = datetime.now(timezone.utc)
+    for outcome in outcomes:
+        if outcome.error is not None:
+            continue
+        item = outcome.item
+        item.status = to_status
+        if action == "complete":
+            item.tx_hash = (tx_hashes or {}).get(item.id)
+            item.completed_at = now
+        else:
+            item.note = note
+            item.reviewed_at = now
+
+        if action == "reject":
+            balance = balances.get((item.user_id, item.coin))
+            if balance is None:
+                balance = balances[(item.user_id, item.coin)] = Balance(user_id=item.user_id, coin=item.coin, amount=Decimal("0"))
+                db.add(balance)
+            balance.amount = balance.amount + item.amount
+
+        if item.transaction_id is not None:
+            tx = transactions.get(item.transaction_id)
+        else:
+            tx = await _withdrawal_transaction(db, item, from_status)
+        if tx:
+            tx.status = to_status
+
+        details = {"withdrawal_id": item.id, "user_id": item.user_id, "coin": item.coin, "amount": str(item.amount)}
+        details.update({"tx_hash": item.tx_hash} if action == "complete" else {"note": item.note})
+        outcome.audit = details
+    return outcomes
+
 
+def _log_reviews(outcomes: list[_Reviewed], action: str, admin: User) -> None:
+    to_status = WITHDRAWAL_TRANSITIONS[action][1]
+    for outcome in outcomes:
+        if outcome.audit is not None:
+            log_action(f"admin_withdrawal_{to_status}", admin.id, outcome.audit)
+
+
+async def _review_one(db: AsyncSession, withdrawal_id: int, action: str, admin: User, **changes) -> WithdrawalQueue:
+    outcomes = await _review_withdrawals(db, [withdrawal_id], action, **changes)
+    [outcome] = outcomes
+    if outcome.error:
+        raise HTTPException(status_code=outcome.status_code, detail=outcome.error)
     await db.commit()
-    log_action("admin_withdrawal_approved", current_user.id, {"withdrawal_id": item.id, "user_id": item.user_id, "coin": item.coin, "amount": str(item.amount), "note": item.note})
-    await db.refresh(item)
-    return item
+    _log_reviews(outcomes, action, admin)
+    await db.refresh(outcome.item)
+    return outcome.item
 
 
-@router.post("/withdrawals/{withdrawal_id}/reject", response_model=WithdrawalQueueOut)
-async def reject_withdrawal(
+async def _review_batch(db: AsyncSession, ids: list[int], action: str, admin: User, **changes) -> list[dict]:
+    outcomes = await _review_withdrawals(db, ids, action, **changes)
+    await db.commit()
+    _log_reviews(outcomes, action, admin)
+    return [
+        {"id": o.withdrawal_id, "ok": o.error is None, "status": o.item.status if o.item else None, "error": o.error}
+        for o in outcomes
+    ]
+
+
+@router.post("/withdrawals/batch/approve", response_model=list[WithdrawalBatchResultOut])
+async def approve_withdrawals(payload: WithdrawalBatchReviewIn, db: AsyncSession = Depends(get_db), current_user: User = Depends(require_admin)):
+    return await _review_batch(db, payload.ids, "approve", current_user, note=payload.note)
+
+
+@router.post("/withdrawals/batch/reject", response_model=list[WithdrawalBatchResultOut])
+async def reject_withdrawals(payload: WithdrawalBatchReviewIn, db: AsyncSession = Depends(get_db), current_user: User = Depends(require_admin)):
+    return await _review_batch(db, payload.ids, "reject", current_user, note=payload.note)
+
+
+@router.post("/withdrawals/batch/complete", response_model=list[WithdrawalBatchResultOut])
+async def complete_withdrawals(payload: WithdrawalBatchCompleteIn, db: AsyncSession = Depends(get_db), current_user: User = Depends(require_admin)):
+    tx_hashes = {item.id: item.tx_hash for item in payload.items}
+    return await _review_batch(db, [item.id for item in payload.items], "complete", current_user, tx_hashes=tx_hashes)
+
+
+@router.post("/withdrawals/{withdrawal_id}/approve", response_model=WithdrawalQueueOut)
+async def approve_withdrawal(
     withdrawal_id: int,
     payload: WithdrawalReviewIn,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_admin),
 ):
-    item = await db.get(WithdrawalQueue, withdrawal_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Withdrawal request not found")
-    if item.status != "pending":
-        raise HTTPException(status_code=409, detail="Only pending requests can be rejected")
-
-    item.status = "rejected"
-    item.note = payload.note
-    item.reviewed_at = datetime.now(timezone.utc)
-
-    balance_result = await db.execute(select(Balance).where(Balance.user_id == item.user_id, Balance.coin == item.coin))
-    balance = balance_result.scalar_one_or_none()
-    if balance is None:
-        balance = Balance(user_id=item.user_id, coin=item.coin, amount=Decimal("0"))
-        db.add(balance)
-    balance.amount = balance.amount + item.amount
+    return await _review_one(db, withdrawal_id, "approve", current_user, note=payload.note)
 
-    tx_result = await db.execute(
-        select(Transaction)
-        .where(
-            Transaction.user_id == item.user_id,
-            Transaction.coin == item.coin,
-            Transaction.amount == item.amount,
-            Transaction.type == "withdrawal",
-            Transaction.status == "pending",
-        )
-        .order_by(Transaction.created_at.desc())
-    )
-    tx = tx_result.scalars().first()
-    if tx:
-        tx.status = "rejected"
 
-    await db.commit()
-    log_action("admin_withdrawal_rejected", current_user.id, {"withdrawal_id": item.id, "user_id": item.user_id, "coin": item.coin, "amount": str(item.amount), "note": item.note})
-    await db.refresh(item)
-    return item
+@router.post("/withdrawals/{withdrawal_id}/reject", response_model=WithdrawalQueueOut)
+async def reject_withdrawal(
+    withdrawal_id: int,
+    payload: WithdrawalReviewIn,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    return await _review_one(db, withdrawal_id, "reject", current_user, note=payload.note)
 
 
 @router.post("/withdrawals/{withdrawal_id}/complete", response_model=WithdrawalQueueOut)
@@ -157,32 +354,4 @@ async def complete_withdrawal(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_admin),
 ):
-    item = await db.get(WithdrawalQueue, withdrawal_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Withdrawal request not found")
-    if item.status != "approved":
-        raise HTTPException(status_code=409, detail="Only approved requests can be completed")
-
-    item.status = "completed"
-    item.tx_hash = payload.tx_hash
-    item.completed_at = datetime.now(timezone.utc)
-
-    tx_result = await db.execute(
-        select(Transaction)
-        .where(
-            Transaction.user_id == item.user_id,
-            Transaction.coin == item.coin,
-            Transaction.amount == item.amount,
-            Transaction.type == "withdrawal",
-            Transaction.status == "approved",
-        )
-        .order_by(Transaction.created_at.desc())
-    )
-    tx = tx_result.scalars().first()
-    if tx:
-        tx.status = "completed"
-
-    await db.commit()
-    log_action("admin_withdrawal_completed", current_user.id, {"withdrawal_id": item.id, "user_id": item.user_id, "coin": item.coin, "amount": str(item.amount), "tx_hash": item.tx_hash})
-    await db.refresh(item)
-    return item
+    return await _review_one(db, withdrawal_id, "complete", current_user, tx_hashes={withdrawal_id: payload.tx_hash})
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy import or_, select, text
+from sqlalchemy import or_, select, text, update
 from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from App.core.security import create_access_token, decode_access_token, get_password_hash, validate_password_strength, verify_password
+from App.core.logger import log_action, logger
+from App.core.security import create_access_token, decode_access_token, password_needs_rehash, validate_password_strength
 from App.database import get_db
 from App.models.user import Role, User
 from App.schemas.user import RegisterRequest, TokenResponse, UserOut
+from App.services.password_hasher import password_hasher
+from App.services.user_cache import user_cache
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -62,10 +65,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     if not payload or "sub" not in payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
 
+    user = await user_cache.get(db, payload["sub"])
+    if user is not None:
+        return user
+
     result = await _safe_execute(db, select(User).where(User.email == payload["sub"]))
     user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    user_cache.put(payload["sub"], user)
     return user
 
 
@@ -88,7 +96,7 @@ async def register_user(payload: RegisterRequest, db: AsyncSession = Depends(get
         email=payload.email,
         username=payload.username,
         phone=payload.phone,
-        hashed_password=get_password_hash(payload.password),
+        hashed_password=await password_hasher.hash(payload.password),
         role=Role.USER,
     )
     db.add(user)
@@ -97,13 +105,39 @@ async def register_user(payload: RegisterRequest, db: AsyncSession = Depends(get
     return user
 
 
+async def _rehash_password(db: AsyncSession, user_id: int, email: str, old_hash: str, password: str) -> None:
+    # Runs after the login response is sent; the request's session reopens on first use and is closed here.
+    try:
+        new_hash = await password_hasher.hash(password)
+        # Skip if the password changed meanwhile.
+        result = await db.execute(
+            update(User).where(User.id == user_id, User.hashed_password == old_hash).values(hashed_password=new_hash)
+        )
+        await db.commit()
+        if result.rowcount:
+            password_hasher.rehashed += 1
+            user_cache.invalidate(email)
+            log_action("password_rehashed", user_id, {"from": old_hash.split("$")[1]})
+    except Exception:  # noqa: BLE001 - the user is already logged in; retry on the next login
+        logger.exception("Password rehash failed for user %s", user_id)
+    finally:
+        await db.close()
+
+
 @router.post("/login", response_model=TokenResponse)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)) -> TokenResponse:
+async def login(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db),
+) -> TokenResponse:
     result = await _safe_execute(db, select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    if password_needs_rehash(user.hashed_password):
+        background_tasks.add_task(_rehash_password, db, user.id, user.email, user.hashed_password, form_data.password)
+
     token = create_access_token({"sub": user.email, "role": user.role.value})
     return TokenResponse(access_token=token)
 
@@ -1,31 +1,108 @@
-from fastapi import APIRouter, WebSocket
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, status
 from fastapi.websockets import WebSocketDisconnect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from App.Api.v1.endpoints.trades import split_symbol
+from App.core.config import settings
+from App.database import get_db
+from App.dependencies import require_admin
+from App.models.user import User
+from App.services.book_feed import CLOSED, RESYNC, book_feed
+from App.services.broadcaster import broadcaster
+from App.services.event_bus import event_bus
+from App.services.order_book import order_books
+from App.services.password_hasher import password_hasher
+from App.services.sequencer import sequencer
 
 router = APIRouter()
-active_connections: list[WebSocket] = []
+# Events from every worker arrive through the bus; this worker's sockets get them via the broadcaster.
+event_bus.subscribe(broadcaster.publish)
+
+
+@router.get("/matching")
+async def matching_stats(current_user: User = Depends(require_admin)):
+    return sequencer.stats()
+
+
+@router.get("/broadcast")
+async def broadcast_stats(current_user: User = Depends(require_admin)):
+    return broadcaster.stats()
+
+
+@router.get("/password_hashing")
+async def password_hashing_stats(current_user: User = Depends(require_admin)):
+    return password_hasher.stats()
 
 
 @router.websocket("/live_transactions")
 async def monitor_transactions(websocket: WebSocket):
     await websocket.accept()
-    active_connections.append(websocket)
+    broadcaster.connect(websocket)
     try:
         while True:
             message = await websocket.receive_text()
             if message == "ping":
-                await websocket.send_text("pong")
+                broadcaster.send(websocket, "pong")
     except WebSocketDisconnect:
-        if websocket in active_connections:
-            active_connections.remove(websocket)
+        pass
+    finally:
+        broadcaster.disconnect(websocket)
 
 
-async def notify_clients(event: dict):
-    disconnected: list[WebSocket] = []
-    for connection in active_connections:
+@router.websocket("/orderbook/{symbol}")
+async def orderbook_feed(websocket: WebSocket, symbol: str, db: AsyncSession = Depends(get_db)):
+    """Snapshot, then level diffs for one symbol. Send "resync" after a seq gap."""
+    try:
+        base_coin, quote_coin = split_symbol(symbol)
+    except HTTPException:
+        base_coin, quote_coin = "", ""
+    if base_coin not in settings.SUPPORTED_CURRENCIES:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    clean = f"{base_coin}{quote_coin}"
+    await websocket.accept()
+    await order_books.get(db, clean)
+    # The session is only needed to warm the book; don't hold a connection for the socket's lifetime.
+    await db.close()
+
+    queue = book_feed.subscribe(clean)
+
+    async def read_commands() -> None:
         try:
-            await connection.send_json(event)
-        except Exception:
-            disconnected.append(connection)
-    for ws in disconnected:
-        if ws in active_connections:
-            active_connections.remove(ws)
+            while True:
+                message = await websocket.receive_text()
+                if message == "resync":
+                    book_feed.push(queue, RESYNC)
+                elif message == "ping":
+                    book_feed.push(queue, "pong")
+        except WebSocketDisconnect:
+            pass
+        finally:
+            book_feed.push(queue, CLOSED)
+
+    reader = asyncio.create_task(read_commands())
+    try:
+        while True:
+            message = await queue.get()
+            if message is CLOSED:
+                break
+            if message is RESYNC:
+                message = book_feed.snapshot(clean)
+                if message is None:
+                    # Book was dropped after a failed settlement; warm it again and retry.
+                    await order_books.get(db, clean)
+                    await db.close()
+                    message = book_feed.snapshot(clean)
+            await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        book_feed.unsubscribe(clean, queue)
+        reader.cancel()
+
+
+async def notify_clients(event: dict):
+    await event_bus.publish(event)
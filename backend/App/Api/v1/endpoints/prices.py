@@ -1,31 +1,55 @@
-from fastapi import APIRouter, HTTPException
-import httpx
+from datetime import datetime, timezone
 
-router = APIRouter()
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from App.database import get_db
+from App.services.price_fetcher import price_fetcher
+from App.services.ticker import supported_symbols, ticker_index
 
-COINGECKO_URL = "https://api.coingecko.com/api/v3/simple/price"
-COIN_MAP = {
-    "BTC": "bitcoin",
-    "ETH": "ethereum",
-    "LTC": "litecoin",
-    "BCH": "bitcoin-cash",
-    "USDT": "tether",
-    "SOL": "solana",
-    "XRP": "ripple",
-    "ADA": "cardano",
-}
+router = APIRouter()
 
 
 @router.get("/")
-async def get_crypto_prices():
-    ids = ",".join(COIN_MAP.values())
-    params = {"ids": ids, "vs_currencies": "usd"}
+async def get_crypto_prices(response: Response, db: AsyncSession = Depends(get_db)):
+    # Only the trade tape: books are warmed lazily inside their own sequencer lanes.
+    await ticker_index.warm_trades(db, supported_symbols())
+    internal = {}
+    for symbol in supported_symbols():
+        ticker = ticker_index.get(symbol)
+        if ticker is not None and ticker.reference_price is not None:
+            internal[symbol[:-4]] = float(ticker.reference_price)
+
+    # Our own prices never wait on the upstream; only a response with nothing else to show does.
+    snapshot = price_fetcher.current() if internal else await price_fetcher.latest()
+    if snapshot is None:
+        if not internal:
+            raise HTTPException(status_code=502, detail="Failed to fetch prices from upstream API")
+        response.headers["X-Prices-Source"] = "internal"
+        return internal
+
+    response.headers["X-Prices-Fetched-At"] = datetime.fromtimestamp(snapshot.fetched_at, timezone.utc).isoformat()
+    response.headers["X-Prices-Age-Seconds"] = f"{snapshot.age():.1f}"
+    response.headers["X-Prices-Stale"] = "true" if price_fetcher.is_stale() else "false"
+    # Upstream prices win; our own last trade or mid fills coins the upstream did not quote.
+    prices = dict(snapshot.prices)
+    for coin, price in internal.items():
+        if prices.get(coin) is None:
+            prices[coin] = price
+    return prices
+
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(COINGECKO_URL, params=params)
+@router.get("/ticker")
+async def get_tickers(db: AsyncSession = Depends(get_db)):
+    symbols = supported_symbols()
+    await ticker_index.warm(db, symbols)
+    return [ticker_index.get(symbol).as_dict() for symbol in symbols]
 
-    if response.status_code != 200:
-        raise HTTPException(status_code=502, detail="Failed to fetch prices from upstream API")
 
-    payload = response.json()
-    return {symbol: payload.get(coin_id, {}).get("usd") for symbol, coin_id in COIN_MAP.items()}
+@router.get("/ticker/{symbol}")
+async def get_ticker(symbol: str, db: AsyncSession = Depends(get_db)):
+    clean = symbol.replace("/", "").upper()
+    if clean not in supported_symbols():
+        raise HTTPException(status_code=404, detail="Unknown symbol")
+    await ticker_index.warm(db, [clean])
+    return ticker_index.get(clean).as_dict()
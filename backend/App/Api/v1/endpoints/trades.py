@@ -1,22 +1,31 @@
-from datetime import datetime, timezone
-from decimal import Decimal
+from typing import Awaitable, Callable, TypeVar
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from App.Api.v1.endpoints.auth import get_current_user
+from App.core.config import settings
 from App.database import get_db
 from App.dependencies import require_admin
-from App.models.balance import Balance
 from App.models.order import Order
-from App.models.transaction import Transaction
 from App.models.user import User
 from App.schemas.order import OrderOut, PlaceOrderRequest
-from App.services.trading_engine import SimpleOrder, match_orders, settle_trade
+from App.services.book_feed import book_feed
+from App.services.candles import CANDLE_HISTORY, INTERVALS, candle_aggregator
+from App.services.event_bus import event_bus
+from App.services.fixed_point import scale_for
+from App.services.order_book import OrderBook, order_books
+from App.services.sequencer import SequencerBusy, sequencer
+from App.services.settlement import BatchSettlement, settle_matches
+from App.services.ticker import ticker_index
+from App.services.trading_engine import MatchExecution, SimpleOrder
+from App.utils.pagination import newest_first, page
 
 router = APIRouter()
 
+T = TypeVar("T")
+
 
 def split_symbol(symbol: str) -> tuple[str, str]:
     clean = symbol.replace("/", "").upper()
@@ -25,13 +34,21 @@ def split_symbol(symbol: str) -> tuple[str, str]:
     raise HTTPException(status_code=400, detail="Only */USDT symbols are supported")
 
 
-async def get_or_create_balance(db: AsyncSession, user_id: int, coin: str) -> Balance:
-    result = await db.execute(select(Balance).where(Balance.user_id == user_id, Balance.coin == coin))
-    bal = result.scalar_one_or_none()
-    if bal is None:
-        bal = Balance(user_id=user_id, coin=coin, amount=Decimal("0"))
-        db.add(bal)
-    return bal
+async def _sequenced(symbol: str, run: Callable[[], Awaitable[T]], name: str) -> T:
+    # All book changes for a symbol go through its single-writer lane; no row locks needed.
+    async def run_and_publish() -> T:
+        try:
+            return await run()
+        finally:
+            book_feed.publish(symbol)
+            book = order_books.peek(symbol)
+            if book is not None:
+                ticker_index.update_quotes(symbol, book.best_bid(), book.best_ask())
+
+    try:
+        return await sequencer.submit(symbol, run_and_publish, name)
+    except SequencerBusy as exc:
+        raise HTTPException(status_code=503, detail="Matching engine is busy, please retry") from exc
 
 
 @router.post("/")
@@ -39,123 +56,211 @@ async def place_order(payload: PlaceOrderRequest, db: AsyncSession = Depends(get
     if payload.price <= 0 or payload.amount <= 0:
         raise HTTPException(status_code=400, detail="Price and amount must be greater than zero")
 
-    symbol = payload.symbol.replace("/", "").upper()
-    order = Order(
-        user_id=user.id,
-        side=payload.side,
-        symbol=symbol,
-        price=payload.price,
-        amount=payload.amount,
-    )
-    db.add(order)
-    await db.commit()
-    await db.refresh(order)
+    base_coin, quote_coin = split_symbol(payload.symbol)
+    if base_coin not in settings.SUPPORTED_CURRENCIES:
+        raise HTTPException(status_code=404, detail="Unknown symbol")
+    symbol = f"{base_coin}{quote_coin}"
+    if settings.MATCHING_FIXED_POINT:
+        scale = scale_for(symbol)
+        if not scale.fits(payload.price, payload.amount):
+            raise HTTPException(status_code=400, detail=f"Price must be a multiple of {scale.tick} and amount a multiple of {scale.lot}")
+
+    async def place() -> tuple[Order, list[BatchSettlement]]:
+        # Warm the book before inserting so the new order is not loaded twice.
+        book = await order_books.get(db, symbol)
+        order = Order(
+            user_id=user.id,
+            side=payload.side,
+            symbol=symbol,
+            price=payload.price,
+            amount=payload.amount,
+        )
+        db.add(order)
+        await db.commit()
+        await db.refresh(order)
+
+        batches = []
+        try:
+            # The checked payload, not the re-read row: a float-backed column can return 100.01 as 100.010000000000005.
+            fills = book.submit(
+                SimpleOrder(
+                    id=order.id,
+                    user_id=user.id,
+                    side=payload.side,
+                    price=payload.price,
+                    amount=payload.amount,
+                    created_at_ts=order.created_at.timestamp(),
+                )
+            )
+            while fills:
+                batches.append(await _settle_matches(db, book, fills, base_coin, quote_coin))
+                # Makers cancelled as unfunded hand back their share of the order; match what is left of it.
+                fills = book.cross(order.id)
+        except Exception:
+            # The order row is committed but the book may not hold it; reload the book on next use.
+            order_books.invalidate(symbol)
+            raise
+        return order, batches
+
+    order, batches = await _sequenced(symbol, place, "place")
+    for batch in batches:
+        await _publish_trades(symbol, batch)
+    settled = next((batch.orders[order.id] for batch in reversed(batches) if order.id in batch.orders), None)
+    return {
+        "message": "Order created",
+        "order_id": order.id,
+        "status": settled.status if settled else order.status,
+        "remaining": str(settled.order.amount if settled else order.amount),
+        "fills": [
+            {
+                "price": str(m.price),
+                "amount": str(m.amount),
+                "counter_order_id": m.sell_order_id if payload.side == "buy" else m.buy_order_id,
+            }
+            for batch in batches
+            for m in batch.executed
+            if order.id in (m.buy_order_id, m.sell_order_id)
+        ],
+    }
+
 
-    return {"message": "Order created", "order_id": order.id}
+@router.delete("/{order_id}")
+async def cancel_order(order_id: int, db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
+    order = await db.get(Order, order_id)
+    if order is None or order.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Order not found")
+
+    async def cancel() -> None:
+        await db.refresh(order)
+        if order.status != "open":
+            raise HTTPException(status_code=409, detail="Only open orders can be cancelled")
+
+        order.status = "cancelled"
+        await db.commit()
+
+        book = await order_books.get(db, order.symbol)
+        book.remove(order.id)
+
+    await _sequenced(order.symbol, cancel, "cancel")
+    return {"message": "Order cancelled", "order_id": order.id}
 
 
 @router.get("/", response_model=list[OrderOut])
-async def get_trade_history(db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
-    result = await db.execute(select(Order).where(Order.user_id == user.id).order_by(Order.created_at.desc()))
-    return list(result.scalars().all())
+async def get_trade_history(
+    response: Response,
+    status: str | None = Query(None, pattern="^(open|filled|cancelled)$"),
+    symbol: str | None = None,
+    side: str | None = Query(None, pattern="^(buy|sell)$"),
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Newest first; the next page's cursor is returned in X-Next-Cursor."""
+    stmt = select(Order).where(Order.user_id == user.id)
+    if status is not None:
+        stmt = stmt.where(Order.status == status)
+    if symbol is not None:
+        stmt = stmt.where(Order.symbol == symbol.replace("/", "").upper())
+    if side is not None:
+        stmt = stmt.where(Order.side == side)
+    stmt = newest_first(stmt, Order.created_at, Order.id, cursor)
+
+    result = await db.execute(stmt.limit(limit + 1))
+    return page(list(result.scalars().all()), limit, response)
 
 
 @router.get("/orderbook/{symbol}")
-async def get_orderbook(symbol: str, db: AsyncSession = Depends(get_db)):
-    clean = symbol.replace("/", "").upper()
-    buys = await db.execute(
-        select(Order).where(Order.symbol == clean, Order.side == "buy", Order.status == "open").order_by(Order.price.desc(), Order.created_at.asc())
-    )
-    sells = await db.execute(
-        select(Order).where(Order.symbol == clean, Order.side == "sell", Order.status == "open").order_by(Order.price.asc(), Order.created_at.asc())
-    )
+async def get_orderbook(symbol: str, depth: int = Query(50, ge=1, le=500), db: AsyncSession = Depends(get_db)):
+    base_coin, quote_coin = split_symbol(symbol)
+    if base_coin not in settings.SUPPORTED_CURRENCIES:
+        raise HTTPException(status_code=404, detail="Unknown symbol")
+
+    # Served from the in-memory book; the snapshot is shared by every poller until the book changes.
+    book = await order_books.get(db, f"{base_coin}{quote_coin}")
+    return {"symbol": book.symbol, **book.snapshot(depth)}
+
 
+@router.get("/candles/{symbol}")
+async def get_candles(
+    symbol: str,
+    interval: str = Query("1m"),
+    limit: int = Query(100, ge=1, le=CANDLE_HISTORY),
+    db: AsyncSession = Depends(get_db),
+):
+    base_coin, quote_coin = split_symbol(symbol)
+    if base_coin not in settings.SUPPORTED_CURRENCIES:
+        raise HTTPException(status_code=404, detail="Unknown symbol")
+    if interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Interval must be one of {', '.join(INTERVALS)}")
+
+    clean = f"{base_coin}{quote_coin}"
+    if not candle_aggregator.is_warm(clean, interval):
+        # Loaded from the rollup table inside the symbol's lane, so no settling batch is missed.
+        await _sequenced(clean, lambda: candle_aggregator.warm(db, clean, interval), "warm_candles")
     return {
         "symbol": clean,
-        "bids": [{"id": o.id, "price": str(o.price), "amount": str(o.amount)} for o in buys.scalars().all()],
-        "asks": [{"id": o.id, "price": str(o.price), "amount": str(o.amount)} for o in sells.scalars().all()],
+        "interval": interval,
+        "candles": [c.as_dict() for c in candle_aggregator.recent(clean, interval, limit)],
     }
 
 
+async def _settle_matches(
+    db: AsyncSession,
+    book: OrderBook,
+    matches: list[MatchExecution],
+    base_coin: str,
+    quote_coin: str,
+) -> BatchSettlement:
+    """Settle book executions, commit, and re-sync the touched orders into the book."""
+    if not matches:
+        return BatchSettlement()
+
+    try:
+        batch = await settle_matches(db, matches, base_coin, quote_coin, scale=book.scale)
+        await db.commit()
+    except Exception:
+        # The book already applied these fills; reload it from the database instead of guessing.
+        order_books.invalidate(book.symbol)
+        raise
+
+    # Skipped executions put their orders back; partial fills take the settled remainder.
+    for settled in batch.orders.values():
+        book.sync(settled.order, settled.status == "open")
+    candle_aggregator.apply(book.symbol, batch.candles)
+    if batch.executed:
+        ticker_index.record_trade(book.symbol, batch.executed[-1].price, batch.executed_at)
+    return batch
+
+
+async def _publish_trades(symbol: str, batch: BatchSettlement) -> None:
+    for m in batch.executed:
+        await event_bus.publish(
+            {
+                "type": "trade",
+                "symbol": symbol,
+                "price": str(m.price),
+                "amount": str(m.amount),
+                "buy_order_id": m.buy_order_id,
+                "sell_order_id": m.sell_order_id,
+            }
+        )
+
+
 @router.post("/match/{symbol}")
 async def run_matching(symbol: str, db: AsyncSession = Depends(get_db), current_user: User = Depends(require_admin)):
     base_coin, quote_coin = split_symbol(symbol)
     clean = f"{base_coin}{quote_coin}"
 
-    buy_result = await db.execute(
-        select(Order).where(Order.symbol == clean, Order.side == "buy", Order.status == "open").order_by(Order.price.desc(), Order.created_at.asc())
-    )
-    sell_result = await db.execute(
-        select(Order).where(Order.symbol == clean, Order.side == "sell", Order.status == "open").order_by(Order.price.asc(), Order.created_at.asc())
-    )
-    buy_orders = list(buy_result.scalars().all())
-    sell_orders = list(sell_result.scalars().all())
-
-    buy_simple = [
-        SimpleOrder(id=o.id, user_id=o.user_id, side=o.side, price=Decimal(o.price), amount=Decimal(o.amount), created_at_ts=o.created_at.timestamp())
-        for o in buy_orders
-    ]
-    sell_simple = [
-        SimpleOrder(id=o.id, user_id=o.user_id, side=o.side, price=Decimal(o.price), amount=Decimal(o.amount), created_at_ts=o.created_at.timestamp())
-        for o in sell_orders
-    ]
-
-    matches = match_orders(buy_simple, sell_simple)
-    if not matches:
-        return {"symbol": clean, "matches": 0, "detail": "No crossable orders"}
+    async def match() -> BatchSettlement | None:
+        book = await order_books.get(db, clean)
+        matches = book.match()
+        if not matches:
+            return None
+        return await _settle_matches(db, book, matches, base_coin, quote_coin)
 
-    by_id = {o.id: o for o in [*buy_orders, *sell_orders]}
-    executed = 0
-
-    for m in matches:
-        buy_order = by_id[m.buy_order_id]
-        sell_order = by_id[m.sell_order_id]
-
-        buyer_quote = await get_or_create_balance(db, buy_order.user_id, quote_coin)
-        buyer_base = await get_or_create_balance(db, buy_order.user_id, base_coin)
-        seller_base = await get_or_create_balance(db, sell_order.user_id, base_coin)
-        seller_quote = await get_or_create_balance(db, sell_order.user_id, quote_coin)
-
-        settlement = settle_trade(price=m.price, amount=m.amount)
-
-        # Skip invalid executions if balances are insufficient at settlement time.
-        required_quote = -settlement.buyer_quote_delta
-        required_base = -settlement.seller_base_delta
-        if buyer_quote.amount < required_quote or seller_base.amount < required_base:
-            continue
-
-        buyer_quote.amount += settlement.buyer_quote_delta
-        buyer_base.amount += settlement.buyer_base_delta
-        seller_base.amount += settlement.seller_base_delta
-        seller_quote.amount += settlement.seller_quote_delta
-
-        buy_order.amount = Decimal(buy_order.amount) - m.amount
-        sell_order.amount = Decimal(sell_order.amount) - m.amount
-        buy_order.status = "filled" if buy_order.amount == 0 else "open"
-        sell_order.status = "filled" if sell_order.amount == 0 else "open"
-
-        now = datetime.now(timezone.utc)
-        db.add(
-            Transaction(
-                user_id=buy_order.user_id,
-                coin=base_coin,
-                amount=settlement.buyer_base_delta,
-                type="trade_buy",
-                status="completed",
-                created_at=now,
-            )
-        )
-        db.add(
-            Transaction(
-                user_id=sell_order.user_id,
-                coin=quote_coin,
-                amount=settlement.seller_quote_delta,
-                type="trade_sell",
-                status="completed",
-                created_at=now,
-            )
-        )
-        executed += 1
-
-    await db.commit()
-    return {"symbol": clean, "matches": executed}
+    batch = await _sequenced(clean, match, "match")
+    if batch is None:
+        return {"symbol": clean, "matches": 0, "detail": "No crossable orders"}
+    await _publish_trades(clean, batch)
+    return {"symbol": clean, "matches": len(batch.executed)}
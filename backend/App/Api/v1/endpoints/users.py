@@ -3,11 +3,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from App.Api.v1.endpoints.auth import get_current_user
-from App.core.security import get_password_hash, validate_password_strength, verify_password
+from App.core.security import validate_password_strength
 from App.database import get_db
 from App.dependencies import require_admin
 from App.models.user import User
 from App.schemas.user import PasswordUpdateRequest, UserOut, UserUpdateRequest
+from App.services.password_hasher import password_hasher
+from App.services.user_cache import user_cache
 
 router = APIRouter()
 
@@ -29,6 +31,7 @@ async def update_profile(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> User:
+    previous_email = current_user.email
     if payload.email is not None and payload.email != current_user.email:
         exists = await db.execute(select(User).where(User.email == payload.email, User.id != current_user.id))
         if exists.scalar_one_or_none():
@@ -45,6 +48,7 @@ async def update_profile(
         current_user.phone = payload.phone
 
     await db.commit()
+    user_cache.invalidate(previous_email, current_user.email)
     await db.refresh(current_user)
     return current_user
 
@@ -55,10 +59,11 @@ async def update_password(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> dict[str, str]:
-    if not verify_password(payload.current_password, current_user.hashed_password):
+    if not await password_hasher.verify(payload.current_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
 
     validate_password_strength(payload.new_password)
-    current_user.hashed_password = get_password_hash(payload.new_password)
+    current_user.hashed_password = await password_hasher.hash(payload.new_password)
     await db.commit()
+    user_cache.invalidate(current_user.email)
     return {"message": "Password updated"}
@@ -13,6 +13,7 @@ from App.models.user import User
 from pydantic import BaseModel
 
 from App.schemas.queue import WithdrawalQueueOut, WithdrawalRequestIn
+from App.services.event_bus import event_bus
 
 router = APIRouter()
 
@@ -44,6 +45,7 @@ async def deposit_funds(payload: DepositRequest, db: AsyncSession = Depends(get_
     balance.amount = balance.amount + payload.amount
     db.add(Transaction(user_id=user.id, coin=payload.coin.upper(), amount=payload.amount, type="deposit", status="completed"))
     await db.commit()
+    await event_bus.publish({"type": "transaction", "kind": "deposit", "coin": payload.coin.upper(), "amount": str(payload.amount), "status": "completed"})
 
     return {"message": "Deposit recorded", "coin": payload.coin.upper(), "new_balance": str(balance.amount)}
 
@@ -64,18 +66,23 @@ async def request_withdrawal(
 
     balance.amount = balance.amount - payload.amount
 
+    tx = Transaction(user_id=user.id, coin=payload.coin.upper(), amount=payload.amount, type="withdrawal", status="pending")
+    db.add(tx)
+    await db.flush()
+
     queue_item = WithdrawalQueue(
         user_id=user.id,
+        transaction_id=tx.id,
         coin=payload.coin.upper(),
         amount=payload.amount,
         destination_address=payload.destination_address,
         status="pending",
     )
     db.add(queue_item)
-    db.add(Transaction(user_id=user.id, coin=payload.coin.upper(), amount=payload.amount, type="withdrawal", status="pending"))
 
     await db.commit()
     await db.refresh(queue_item)
+    await event_bus.publish({"type": "transaction", "kind": "withdrawal", "coin": queue_item.coin, "amount": str(queue_item.amount), "status": "pending"})
     return queue_item
 
 
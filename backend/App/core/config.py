@@ -16,13 +16,40 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "your-secret-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Verified tokens remembered until their exp, so repeat requests skip the HMAC check; 0 disables.
+    JWT_CACHE_MAX_ENTRIES: int = 10_000
 
     AUTH_LOGIN_RATE_LIMIT: int = 20
     AUTH_REGISTER_RATE_LIMIT: int = 10
     AUTH_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    # "memory" (per process) or "sqlite" (a file shared by every worker on the host). Either keeps at most MAX_KEYS clients.
+    AUTH_RATE_LIMIT_BACKEND: str = "memory"
+    AUTH_RATE_LIMIT_SQLITE_PATH: str = "rate_limits.sqlite3"
+    AUTH_RATE_LIMIT_MAX_KEYS: int = 100_000
+    # Authenticated users are cached by token subject; 0 disables. Role changes made outside this process take up to the TTL.
+    AUTH_USER_CACHE_TTL_SECONDS: int = 30
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10_000
+    # Threads that hash and verify passwords off the event loop; bursts beyond this queue.
+    PASSWORD_HASH_WORKERS: int = 4
+    # Pin pbkdf2_sha256 to this many rounds (passlib's default when unset). Hashes at any other count, and
+    # legacy bcrypt hashes, are rehashed after the user's next successful login.
+    PASSWORD_PBKDF2_ROUNDS: int | None = None
+
+    MATCHING_QUEUE_MAX_DEPTH: int = 1000
+    # Match on integer ticks/lots (see App/services/fixed_point.py) instead of Decimal.
+    MATCHING_FIXED_POINT: bool = False
+
+    # Per-connection WebSocket send queue; a client that falls this far behind is closed (or loses events).
+    WS_SEND_QUEUE_MAX_DEPTH: int = 256
+    WS_DISCONNECT_SLOW_CLIENTS: bool = True
+    # "local" (single worker) or "postgres" (LISTEN/NOTIFY, reaches every worker). The DSN defaults to DATABASE_URL.
+    EVENT_BUS_BACKEND: str = "local"
+    EVENT_BUS_DSN: str | None = None
+    EVENT_BUS_CHANNEL: str = "exchange_events"
 
     SUPPORTED_CURRENCIES: List[str] = ["BTC", "ETH", "USDT", "LTC", "BCH"]
     PRICE_UPDATE_INTERVAL: int = 30
+    PRICE_FEED_URL: str = "https://api.coingecko.com/api/v3/simple/price"
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
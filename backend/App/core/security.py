@@ -1,15 +1,24 @@
+import hashlib
 import re
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from fastapi import HTTPException
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from passlib.hash import pbkdf2_sha256
 
 from App.core.config import settings
 
+PBKDF2_ROUNDS = settings.PASSWORD_PBKDF2_ROUNDS or pbkdf2_sha256.default_rounds
+_pbkdf2_rounds = {}
+if settings.PASSWORD_PBKDF2_ROUNDS:
+    _pbkdf2_rounds = {f"pbkdf2_sha256__{bound}_rounds": PBKDF2_ROUNDS for bound in ("default", "min", "max")}
+
 # Keep backward compatibility with older bcrypt hashes while defaulting new hashes to pbkdf2.
-pwd_context = CryptContext(schemes=["pbkdf2_sha256", "bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["pbkdf2_sha256", "bcrypt"], deprecated="auto", **_pbkdf2_rounds)
 
 
 def get_password_hash(password: str) -> str:
@@ -24,6 +33,23 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True for bcrypt hashes and pbkdf2 hashes at other than the configured rounds."""
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except (ValueError, TypeError):
+        return False
+
+
+def describe_password_hash(hashed_password: str) -> tuple[str, int | None]:
+    """(scheme, rounds) of a stored hash, or ("unknown", None) if passlib cannot parse it."""
+    try:
+        scheme = pwd_context.identify(hashed_password)
+        return scheme, pwd_context.handler(scheme).from_string(hashed_password).rounds
+    except (ValueError, TypeError):
+        return "unknown", None
+
+
 def validate_password_strength(password: str) -> None:
     if len(password) < 8:
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters long")
@@ -42,8 +68,51 @@ def create_access_token(data: dict[str, Any], expires_delta: timedelta | None =
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.ALGORITHM)
 
 
+class VerifiedTokenCache:
+    """Claims of tokens that passed verification, keyed by the token's SHA-256 digest.
+
+    An entry is served only until the token's `exp`; tokens without one are never cached.
+    Rotating JWT_SECRET needs a restart, as it does for the settings themselves.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def get(self, digest: bytes) -> dict[str, Any] | None:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[digest]
+            return None
+        self._entries.move_to_end(digest)
+        return dict(entry[1])
+
+    def put(self, digest: bytes, claims: dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if self.max_entries <= 0 or not isinstance(exp, (int, float)):
+            return
+        self._entries[digest] = (exp, dict(claims))
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache(settings.JWT_CACHE_MAX_ENTRIES)
+
+
 def decode_access_token(token: str) -> dict[str, Any] | None:
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = verified_tokens.get(digest)
+    if claims is not None:
+        return claims
     try:
-        return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.ALGORITHM])
+        claims = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
+    verified_tokens.put(digest, claims)
+    return claims
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,12 +9,30 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from App.Api.v1.endpoints import admin, auth, blockchain, monitor, prices, trades, users, wallet
 from App.core.config import settings
 from App.database import get_db
-from App.middleware.rate_limiter import AuthRateLimiter, LimitWindow
+from App.middleware.rate_limiter import AuthRateLimiter, LimitWindow, create_rate_limit_store
+from App.services.broadcaster import broadcaster
+from App.services.event_bus import event_bus
+from App.services.password_hasher import password_hasher
+from App.services.price_fetcher import price_fetcher
+from App.services.sequencer import sequencer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await event_bus.start()
+    yield
+    await sequencer.shutdown()
+    await event_bus.stop()
+    await broadcaster.shutdown()
+    await price_fetcher.stop()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title="Crypto Exchange API",
     description="Simplified centralized crypto exchange (pet project)",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -22,11 +41,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 limiter = AuthRateLimiter(
     login_window=LimitWindow(settings.AUTH_LOGIN_RATE_LIMIT, settings.AUTH_RATE_LIMIT_WINDOW_SECONDS),
     register_window=LimitWindow(settings.AUTH_REGISTER_RATE_LIMIT, settings.AUTH_RATE_LIMIT_WINDOW_SECONDS),
+    store=create_rate_limit_store(),
 )
 
 
@@ -36,9 +57,9 @@ async def auth_sensitive_rate_limit(request: Request, call_next):
     client_ip = request.client.host if request.client else "unknown"
 
     if path == "/api/v1/auth/login":
-        limiter.check(client_ip, "login")
+        await limiter.check(client_ip, "login")
     elif path == "/api/v1/auth/register":
-        limiter.check(client_ip, "register")
+        await limiter.check(client_ip, "register")
 
     return await call_next(request)
 
@@ -1,9 +1,14 @@
+import sqlite3
+import threading
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict
 from dataclasses import dataclass
 
+import anyio
 from fastapi import HTTPException
 
+from App.core.config import settings
+
 
 @dataclass
 class LimitWindow:
@@ -11,16 +16,146 @@ class LimitWindow:
     window_seconds: int
 
 
+def _admit(window: LimitWindow, now: float, state: tuple[int, int, int] | None) -> tuple[bool, tuple[int, int, int]]:
+    """Sliding-window counter: decide one request given a key's (window index, current, previous) counts.
+
+    The count over the last `window_seconds` is estimated as the current fixed
+    window's count plus the previous window's, weighted by how much of it still
+    overlaps. Three integers per key replace a timestamp per request.
+    """
+    index = int(now // window.window_seconds)
+    if state is None or state[0] < index - 1:
+        current, previous = 0, 0
+    elif state[0] == index - 1:
+        current, previous = 0, state[1]
+    else:
+        current, previous = state[1], state[2]
+
+    overlap = 1 - (now % window.window_seconds) / window.window_seconds
+    if current + previous * overlap >= window.max_requests:
+        return False, (index, current, previous)
+    return True, (index, current + 1, previous)
+
+
+class MemoryRateLimitStore:
+    """Counters for one process, evicting the least recently seen key past `max_keys`.
+
+    Keys are kept in last-seen order, so keys idle for two windows (which no
+    longer hold any count) are dropped from the front as they are reached.
+    """
+
+    # Checks run inline on the event loop.
+    blocking = False
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        # key -> ((window index, current, previous), time after which the key holds no count)
+        self._counters: OrderedDict[tuple[str, str], tuple[tuple[int, int, int], float]] = OrderedDict()
+
+    def hit(self, key: tuple[str, str], window: LimitWindow, now: float) -> bool:
+        entry = self._counters.get(key)
+        allowed, state = _admit(window, now, entry[0] if entry else None)
+        self._counters[key] = (state, now + 2 * window.window_seconds)
+        self._counters.move_to_end(key)
+
+        while self._counters:
+            oldest_key, (_, idle_at) = next(iter(self._counters.items()))
+            if len(self._counters) <= self.max_keys and idle_at > now:
+                break
+            del self._counters[oldest_key]
+        return allowed
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def clear(self) -> None:
+        self._counters.clear()
+
+
+class SQLiteRateLimitStore:
+    """Counters in a SQLite file, shared by every worker process on one host.
+
+    Each check is one short IMMEDIATE transaction, which serializes workers on the
+    file's write lock. Idle keys and any excess over `max_keys` are swept every
+    `sweep_every` checks.
+
+    Waiting on that lock blocks, so the limiter runs checks in a worker thread; each
+    thread keeps its own connection.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_keys: int, sweep_every: int = 1000) -> None:
+        self.path = path
+        self.max_keys = max_keys
+        self.sweep_every = sweep_every
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._checks = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, window INTEGER NOT NULL, current INTEGER NOT NULL, previous INTEGER NOT NULL, touched REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limits_touched ON rate_limits (touched)")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: tuple[str, str], window: LimitWindow, now: float) -> bool:
+        conn = self._conn()
+        name = "|".join(key)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT window, current, previous FROM rate_limits WHERE key = ?", (name,)).fetchone()
+            allowed, state = _admit(window, now, row)
+            conn.execute(
+                "INSERT INTO rate_limits (key, window, current, previous, touched) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET window = excluded.window, current = excluded.current, "
+                "previous = excluded.previous, touched = excluded.touched",
+                (name, *state, now),
+            )
+            with self._lock:
+                self._checks += 1
+                sweep = self._checks % self.sweep_every == 0
+            if sweep:
+                self._sweep(conn, now - 2 * window.window_seconds)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed
+
+    def _sweep(self, conn: sqlite3.Connection, idle_before: float) -> None:
+        conn.execute("DELETE FROM rate_limits WHERE touched < ?", (idle_before,))
+        conn.execute(
+            "DELETE FROM rate_limits WHERE key IN (SELECT key FROM rate_limits ORDER BY touched DESC LIMIT -1 OFFSET ?)",
+            (self.max_keys,),
+        )
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM rate_limits")
+
+
 class AuthRateLimiter:
-    """Simple in-memory limiter for auth-sensitive routes.
+    """Per-(client_ip, route_key) limiter for auth-sensitive routes.
 
-    Keyed by (client_ip, route_key). Suitable for single-instance MVP.
+    Memory per key is fixed and each check is O(1). The default store is per
+    process; create_rate_limit_store() picks a shared one from settings.
     """
 
-    def __init__(self, login_window: LimitWindow, register_window: LimitWindow):
+    def __init__(self, login_window: LimitWindow, register_window: LimitWindow, store: MemoryRateLimitStore | SQLiteRateLimitStore | None = None):
         self.login_window = login_window
         self.register_window = register_window
-        self._events: dict[tuple[str, str], deque[float]] = defaultdict(deque)
+        self.store = store if store is not None else MemoryRateLimitStore(max_keys=settings.AUTH_RATE_LIMIT_MAX_KEYS)
 
     def _active_window(self, route_key: str) -> LimitWindow:
         if route_key == "login":
@@ -29,16 +164,23 @@ class AuthRateLimiter:
             return self.register_window
         return LimitWindow(max_requests=10_000, window_seconds=60)
 
-    def check(self, client_ip: str, route_key: str) -> None:
+    async def check(self, client_ip: str, route_key: str) -> None:
         cfg = self._active_window(route_key)
         key = (client_ip, route_key)
-        now = time.time()
-        q = self._events[key]
+        if self.store.blocking:
+            allowed = await anyio.to_thread.run_sync(self.store.hit, key, cfg, time.time())
+        else:
+            allowed = self.store.hit(key, cfg, time.time())
+        if not allowed:
+            raise HTTPException(status_code=429, detail="Too many requests. Please try again later.")
 
-        while q and now - q[0] > cfg.window_seconds:
-            q.popleft()
+    def clear(self) -> None:
+        self.store.clear()
 
-        if len(q) >= cfg.max_requests:
-            raise HTTPException(status_code=429, detail="Too many requests. Please try again later.")
 
-        q.append(now)
+def create_rate_limit_store() -> MemoryRateLimitStore | SQLiteRateLimitStore:
+    if settings.AUTH_RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteRateLimitStore(settings.AUTH_RATE_LIMIT_SQLITE_PATH, settings.AUTH_RATE_LIMIT_MAX_KEYS)
+    if settings.AUTH_RATE_LIMIT_BACKEND != "memory":
+        raise ValueError(f"Unknown AUTH_RATE_LIMIT_BACKEND {settings.AUTH_RATE_LIMIT_BACKEND!r}; expected 'memory' or 'sqlite'")
+    return MemoryRateLimitStore(settings.AUTH_RATE_LIMIT_MAX_KEYS)
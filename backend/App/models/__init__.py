@@ -1,7 +1,9 @@
 from .balance import Balance
 from .base import Base
+from .candle import Candle
 from .order import Order
 from .queue import WithdrawalQueue
+from .trade import Trade
 from .transaction import Transaction
 from .user import Role, User
 from .wallet import Wallet
@@ -13,6 +15,8 @@ __all__ = [
     "Balance",
     "Transaction",
     "Order",
+    "Trade",
+    "Candle",
     "WithdrawalQueue",
     "Wallet",
 ]
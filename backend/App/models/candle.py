@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DateTime, Integer, Numeric, String, UniqueConstraint
+
+from .base import Base
+
+
+class Candle(Base):
+    """OHLCV rollup for one symbol, interval and bucket, upserted as trades settle."""
+
+    __tablename__ = "candles"
+    __table_args__ = (UniqueConstraint("symbol", "interval", "open_time", name="uq_candles_symbol_interval_open_time"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String(20), nullable=False)
+    interval = Column(String(8), nullable=False)
+    open_time = Column(DateTime(timezone=True), nullable=False)
+    open = Column(Numeric(precision=36, scale=18), nullable=False)
+    high = Column(Numeric(precision=36, scale=18), nullable=False)
+    low = Column(Numeric(precision=36, scale=18), nullable=False)
+    close = Column(Numeric(precision=36, scale=18), nullable=False)
+    volume = Column(Numeric(precision=36, scale=18), nullable=False)
+    quote_volume = Column(Numeric(precision=36, scale=18), nullable=False)
+    trades = Column(Integer, nullable=False)
@@ -10,6 +10,8 @@ class WithdrawalQueue(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # The ledger row this request moves through its states. Null only for legacy rows the backfill could not pair.
+    transaction_id = Column(Integer, ForeignKey("transactions.id"), nullable=True, unique=True, index=True)
     coin = Column(String(10), nullable=False)
     amount = Column(Numeric(precision=36, scale=18), nullable=False)
     destination_address = Column(String(255), nullable=False)
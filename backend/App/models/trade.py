@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Numeric, String
+
+from .base import Base
+
+
+class Trade(Base):
+    """One execution between a buy and a sell order, written by settlement."""
+
+    __tablename__ = "trades"
+    __table_args__ = (Index("ix_trades_symbol_created_at", "symbol", "created_at"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String(20), nullable=False)
+    price = Column(Numeric(precision=36, scale=18), nullable=False)
+    amount = Column(Numeric(precision=36, scale=18), nullable=False)
+    buy_order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    sell_order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -1,5 +1,14 @@
 from .order import OrderOut, PlaceOrderRequest
-from .queue import WithdrawalCompleteIn, WithdrawalQueueOut, WithdrawalRequestIn, WithdrawalReviewIn
+from .queue import (
+    WithdrawalBatchCompleteIn,
+    WithdrawalBatchCompleteItem,
+    WithdrawalBatchResultOut,
+    WithdrawalBatchReviewIn,
+    WithdrawalCompleteIn,
+    WithdrawalQueueOut,
+    WithdrawalRequestIn,
+    WithdrawalReviewIn,
+)
 from .transaction import TransactionOut
 from .user import RegisterRequest, TokenResponse, UserOut
 
@@ -12,6 +21,10 @@ __all__ = [
     "WithdrawalReviewIn",
     "WithdrawalCompleteIn",
     "WithdrawalQueueOut",
+    "WithdrawalBatchReviewIn",
+    "WithdrawalBatchCompleteIn",
+    "WithdrawalBatchCompleteItem",
+    "WithdrawalBatchResultOut",
     "PlaceOrderRequest",
     "OrderOut",
 ]
@@ -2,7 +2,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 
 class WithdrawalRequestIn(BaseModel):
@@ -19,9 +19,37 @@ class WithdrawalCompleteIn(BaseModel):
     tx_hash: Optional[str] = None
 
 
+class WithdrawalBatchReviewIn(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=1000)
+    note: Optional[str] = None
+
+
+class WithdrawalBatchCompleteItem(BaseModel):
+    id: int
+    tx_hash: str = Field(min_length=1)
+
+
+class WithdrawalBatchCompleteIn(BaseModel):
+    items: list[WithdrawalBatchCompleteItem] = Field(min_length=1, max_length=1000)
+
+    @model_validator(mode="after")
+    def unique_ids(self):
+        if len({item.id for item in self.items}) != len(self.items):
+            raise ValueError("Each withdrawal id may appear only once")
+        return self
+
+
+class WithdrawalBatchResultOut(BaseModel):
+    id: int
+    ok: bool
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
 class WithdrawalQueueOut(BaseModel):
     id: int
     user_id: int
+    transaction_id: Optional[int] = None
     coin: str
     amount: Decimal
     destination_address: str
@@ -0,0 +1,122 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from App.core.config import settings
+from App.services.order_book import OrderBook, order_books
+
+# Queued for a subscriber in place of a message: send a fresh snapshot at this point.
+RESYNC = object()
+# Queued when the subscriber's socket has gone away: stop sending.
+CLOSED = object()
+
+
+def _levels(levels: list[tuple[Decimal, Decimal, int]]) -> list[dict]:
+    return [{"price": str(price), "amount": str(amount), "orders": count} for price, amount, count in levels]
+
+
+@dataclass
+class _SymbolFeed:
+    seq: int = 0
+    book: OrderBook | None = None
+    subscribers: set[asyncio.Queue] = field(default_factory=set)
+
+
+class BookFeed:
+    """Per-symbol order book channel: one snapshot per subscriber, then level diffs.
+
+    Every diff carries `seq` and `prev_seq`. A client applies a diff only if its
+    `prev_seq` equals the last `seq` it saw; on a gap it asks for a resync and gets a
+    new snapshot. Diff levels hold absolute totals (zero amount = level removed), so
+    applying one twice is harmless and diffs with `seq` <= the snapshot's are skipped.
+    Diff messages are serialized once and queued to every subscriber.
+
+    Each subscriber queue holds at most `max_queue` items. A subscriber that falls
+    that far behind has its backlog replaced by a single resync, since the snapshot
+    it then receives supersedes every diff it missed.
+    """
+
+    def __init__(self, max_queue: int = 256) -> None:
+        self.max_queue = max_queue
+        self._feeds: dict[str, _SymbolFeed] = {}
+        self.resynced = 0
+
+    def subscribe(self, symbol: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        queue.put_nowait(RESYNC)
+        self._feeds.setdefault(symbol, _SymbolFeed()).subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, symbol: str, queue: asyncio.Queue) -> None:
+        feed = self._feeds.get(symbol)
+        if feed is not None:
+            feed.subscribers.discard(queue)
+
+    def push(self, queue: asyncio.Queue, item) -> None:
+        """Queue a message, RESYNC or CLOSED for one subscriber without ever blocking."""
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            closed = item is CLOSED
+            while not queue.empty():
+                closed = queue.get_nowait() is CLOSED or closed
+            if not closed:
+                self.resynced += 1
+            queue.put_nowait(CLOSED if closed else RESYNC)
+
+    def snapshot(self, symbol: str) -> str | None:
+        feed = self._feeds.setdefault(symbol, _SymbolFeed())
+        book = order_books.peek(symbol)
+        if book is None:
+            return None
+        if book is not feed.book:
+            self._adopt(feed, book)
+        snapshot = book.snapshot()
+        return json.dumps({"type": "snapshot", "symbol": symbol, "seq": feed.seq, "bids": snapshot["bids"], "asks": snapshot["asks"]})
+
+    def _adopt(self, feed: _SymbolFeed, book: OrderBook) -> None:
+        # A reloaded book has no diff history against the old one; bump seq so every client resyncs.
+        book.drain_changes()
+        feed.book = book
+        feed.seq += 1
+
+    def publish(self, symbol: str) -> None:
+        """Send the levels changed by the last command. Call from the symbol's sequencer lane."""
+        book = order_books.peek(symbol)
+        if book is None:
+            return
+        feed = self._feeds.get(symbol)
+        if feed is None or not feed.subscribers:
+            book.drain_changes()
+            return
+
+        if book is not feed.book:
+            self._adopt(feed, book)
+            for queue in feed.subscribers:
+                self.push(queue, RESYNC)
+            return
+
+        changes = book.drain_changes()
+        if not changes["buy"] and not changes["sell"]:
+            return
+        feed.seq += 1
+        message = json.dumps(
+            {
+                "type": "diff",
+                "symbol": symbol,
+                "seq": feed.seq,
+                "prev_seq": feed.seq - 1,
+                "bids": _levels(changes["buy"]),
+                "asks": _levels(changes["sell"]),
+            }
+        )
+        for queue in feed.subscribers:
+            self.push(queue, message)
+
+    def clear(self) -> None:
+        self._feeds.clear()
+        self.resynced = 0
+
+
+book_feed = BookFeed(max_queue=settings.WS_SEND_QUEUE_MAX_DEPTH)
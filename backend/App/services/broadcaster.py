@@ -0,0 +1,120 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import WebSocket, status
+
+from App.core.config import settings
+from App.core.logger import logger
+
+
+@dataclass(eq=False)
+class _Connection:
+    websocket: WebSocket
+    queue: asyncio.Queue
+    task: asyncio.Task | None = None
+    dropped: int = 0
+
+
+class Broadcaster:
+    """Fan-out to WebSocket clients that never waits on a client.
+
+    Each event is serialized once and queued to every connection; a task per
+    connection drains its own queue, so one slow socket cannot stall the others.
+    A connection whose queue is full either loses the event (`disconnect_slow=False`)
+    or is closed, so it can reconnect and catch up instead of reading stale events.
+    """
+
+    def __init__(self, max_queue: int = 256, disconnect_slow: bool = True):
+        self.max_queue = max_queue
+        self.disconnect_slow = disconnect_slow
+        # Keyed by id(): Starlette websockets are Mappings and so not hashable.
+        self._connections: dict[int, _Connection] = {}
+        self.published = 0
+        self.dropped = 0
+        self.disconnected = 0
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def connect(self, websocket: WebSocket) -> None:
+        connection = _Connection(websocket=websocket, queue=asyncio.Queue(maxsize=self.max_queue))
+        connection.task = asyncio.get_running_loop().create_task(self._drain(connection))
+        self._connections[id(websocket)] = connection
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        connection = self._connections.pop(id(websocket), None)
+        if connection is not None and connection.task is not None:
+            connection.task.cancel()
+
+    def send(self, websocket: WebSocket, message: str) -> None:
+        """Queue a message for one connection, behind anything already queued for it."""
+        connection = self._connections.get(id(websocket))
+        if connection is not None:
+            self._enqueue(connection, message)
+
+    def publish(self, event: dict[str, Any]) -> None:
+        # Same encoding as WebSocket.send_json.
+        message = json.dumps(event, separators=(",", ":"), ensure_ascii=False, default=str)
+        self.published += 1
+        for connection in list(self._connections.values()):
+            self._enqueue(connection, message)
+
+    def _enqueue(self, connection: _Connection, message: str) -> None:
+        try:
+            connection.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            connection.dropped += 1
+            self.dropped += 1
+            if self.disconnect_slow:
+                self.disconnected += 1
+                self.disconnect(connection.websocket)
+                asyncio.get_running_loop().create_task(self._close(connection.websocket))
+
+    @staticmethod
+    async def _close(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        except Exception:  # noqa: BLE001 - the client may already be gone
+            pass
+
+    async def _drain(self, connection: _Connection) -> None:
+        try:
+            while True:
+                message = await connection.queue.get()
+                await connection.websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001 - a broken socket only affects its own connection
+            self._connections.pop(id(connection.websocket), None)
+
+    def stats(self) -> dict[str, Any]:
+        depths = [c.queue.qsize() for c in self._connections.values()]
+        return {
+            "connections": len(depths),
+            "published": self.published,
+            "dropped": self.dropped,
+            "disconnected_slow": self.disconnected,
+            "max_queue": self.max_queue,
+            "max_queue_depth": max(depths, default=0),
+            "queued": sum(depths),
+        }
+
+    async def shutdown(self) -> None:
+        connections = list(self._connections.values())
+        self._connections.clear()
+        for connection in connections:
+            if connection.task is not None:
+                connection.task.cancel()
+        for connection in connections:
+            if connection.task is not None and connection.task.get_loop() is asyncio.get_running_loop():
+                try:
+                    await connection.task
+                except asyncio.CancelledError:
+                    pass
+                except Exception:  # noqa: BLE001 - shutdown should not fail on a broken connection
+                    logger.exception("Broadcast connection crashed during shutdown")
+
+
+broadcaster = Broadcaster(max_queue=settings.WS_SEND_QUEUE_MAX_DEPTH, disconnect_slow=settings.WS_DISCONNECT_SLOW_CLIENTS)
@@ -0,0 +1,178 @@
+from collections import deque
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from App.models.candle import Candle
+from App.services.trading_engine import MatchExecution
+
+INTERVALS: dict[str, int] = {"1m": 60, "5m": 300, "1h": 3600, "1d": 86400}
+# Most recent candles kept in memory per symbol and interval; also the endpoint's max limit.
+CANDLE_HISTORY = 1000
+
+
+@dataclass(slots=True)
+class OHLCV:
+    open_time: int  # bucket start, epoch seconds
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: Decimal
+    quote_volume: Decimal
+    trades: int
+
+    def add(self, price: Decimal, amount: Decimal) -> None:
+        self.high = max(self.high, price)
+        self.low = min(self.low, price)
+        self.close = price
+        self.volume += amount
+        self.quote_volume += price * amount
+        self.trades += 1
+
+    def merge(self, other: "OHLCV") -> None:
+        """Fold a later part of the same bucket into this candle."""
+        self.high = max(self.high, other.high)
+        self.low = min(self.low, other.low)
+        self.close = other.close
+        self.volume += other.volume
+        self.quote_volume += other.quote_volume
+        self.trades += other.trades
+
+    def as_dict(self) -> dict:
+        return {
+            "open_time": datetime.fromtimestamp(self.open_time, timezone.utc).isoformat(),
+            "open": str(self.open),
+            "high": str(self.high),
+            "low": str(self.low),
+            "close": str(self.close),
+            "volume": str(self.volume),
+            "quote_volume": str(self.quote_volume),
+            "trades": self.trades,
+        }
+
+
+def aggregate(executions: list[MatchExecution], executed_at: datetime) -> dict[str, OHLCV]:
+    """One candle per interval for a batch of executions settled at the same instant, in fill order."""
+    ts = int(executed_at.timestamp())
+    candles: dict[str, OHLCV] = {}
+    for m in executions:
+        for interval, seconds in INTERVALS.items():
+            candle = candles.get(interval)
+            if candle is None:
+                candles[interval] = OHLCV(ts - ts % seconds, m.price, m.price, m.price, m.price, m.amount, m.price * m.amount, 1)
+            else:
+                candle.add(m.price, m.amount)
+    return candles
+
+
+async def write_rollups(db: AsyncSession, symbol: str, candles: dict[str, OHLCV]) -> None:
+    """Upsert a batch's candles into the rollup table with one statement; the caller commits."""
+    if not candles:
+        return
+    dialect = db.bind.dialect.name
+    insert = pg_insert if dialect == "postgresql" else sqlite_insert
+    greatest, least = (func.greatest, func.least) if dialect == "postgresql" else (func.max, func.min)
+
+    stmt = insert(Candle)
+    table = Candle.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["symbol", "interval", "open_time"],
+        set_={
+            "high": greatest(table.c.high, stmt.excluded.high),
+            "low": least(table.c.low, stmt.excluded.low),
+            "close": stmt.excluded.close,
+            "volume": table.c.volume + stmt.excluded.volume,
+            "quote_volume": table.c.quote_volume + stmt.excluded.quote_volume,
+            "trades": table.c.trades + stmt.excluded.trades,
+        },
+    )
+    await db.execute(
+        stmt,
+        [
+            {
+                "symbol": symbol,
+                "interval": interval,
+                "open_time": datetime.fromtimestamp(c.open_time, timezone.utc),
+                "open": c.open,
+                "high": c.high,
+                "low": c.low,
+                "close": c.close,
+                "volume": c.volume,
+                "quote_volume": c.quote_volume,
+                "trades": c.trades,
+            }
+            for interval, c in candles.items()
+        ],
+    )
+
+
+class CandleAggregator:
+    """Recent candles per (symbol, interval), warmed lazily from the rollup table.
+
+    Only loaded series are updated; a series that was never read is left to the
+    rollup table until it is. Warm-ups and updates for a symbol must both run in
+    that symbol's sequencer lane, so no committed batch is missed or counted twice.
+    """
+
+    def __init__(self, history: int = CANDLE_HISTORY):
+        self.history = history
+        self._series: dict[tuple[str, str], deque[OHLCV]] = {}
+
+    async def warm(self, db: AsyncSession, symbol: str, interval: str) -> None:
+        if (symbol, interval) in self._series:
+            return
+        result = await db.execute(
+            select(Candle).where(Candle.symbol == symbol, Candle.interval == interval).order_by(Candle.open_time.desc()).limit(self.history)
+        )
+        rows = reversed(result.scalars().all())
+        self._series[(symbol, interval)] = deque(
+            (
+                OHLCV(
+                    open_time=int(_as_utc(row.open_time).timestamp()),
+                    open=Decimal(row.open),
+                    high=Decimal(row.high),
+                    low=Decimal(row.low),
+                    close=Decimal(row.close),
+                    volume=Decimal(row.volume),
+                    quote_volume=Decimal(row.quote_volume),
+                    trades=row.trades,
+                )
+                for row in rows
+            ),
+            maxlen=self.history,
+        )
+
+    def is_warm(self, symbol: str, interval: str) -> bool:
+        return (symbol, interval) in self._series
+
+    def apply(self, symbol: str, candles: dict[str, OHLCV]) -> None:
+        """Fold a committed batch's candles into the loaded series."""
+        for interval, candle in candles.items():
+            series = self._series.get((symbol, interval))
+            if series is None:
+                continue
+            if series and series[-1].open_time == candle.open_time:
+                series[-1].merge(candle)
+            elif not series or series[-1].open_time < candle.open_time:
+                series.append(replace(candle))
+
+    def recent(self, symbol: str, interval: str, limit: int) -> list[OHLCV]:
+        series = self._series.get((symbol, interval), ())
+        return list(series)[-limit:]
+
+    def clear(self) -> None:
+        self._series.clear()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+candle_aggregator = CandleAggregator()
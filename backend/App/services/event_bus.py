@@ -0,0 +1,156 @@
+import asyncio
+import json
+from typing import Any, Callable
+
+from App.core.config import settings
+from App.core.logger import logger
+
+Handler = Callable[[dict[str, Any]], None]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+PG_NOTIFY_MAX_BYTES = 7999
+RECONNECT_DELAY_SECONDS = 1.0
+
+
+class EventBus:
+    """Delivers published events to every subscribed handler in this process.
+
+    Handlers are plain callables and must not block; the WebSocket broadcaster
+    is the usual subscriber.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: list[Handler] = []
+
+    def subscribe(self, handler: Handler) -> None:
+        self._handlers.append(handler)
+
+    def _dispatch(self, event: dict[str, Any]) -> None:
+        for handler in self._handlers:
+            try:
+                handler(event)
+            except Exception:  # noqa: BLE001 - one bad handler should not starve the rest
+                logger.exception("Event handler failed")
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, event: dict[str, Any]) -> None:
+        self._dispatch(event)
+
+
+class LocalEventBus(EventBus):
+    """Single-process bus: events only reach subscribers in the publishing worker."""
+
+
+class PostgresEventBus(EventBus):
+    """Cross-process bus over Postgres LISTEN/NOTIFY.
+
+    Every worker listens on one channel and publishes with pg_notify, including to
+    itself, so each event reaches every worker's subscribers exactly once. Events
+    too large for a NOTIFY payload, or published while the database is unreachable,
+    are delivered to local subscribers only. Losing either connection, or a failed
+    publish, reconnects both in the background.
+    """
+
+    def __init__(self, dsn: str, channel: str):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self._listen_conn = None
+        self._notify_conn = None
+        self._notify_lock = asyncio.Lock()
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._stopping = False
+        await self._connect()
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        self._listen_conn.add_termination_listener(self._on_terminated)
+        await self._listen_conn.add_listener(self.channel, self._on_notify)
+        self._notify_conn = await asyncpg.connect(self.dsn)
+        self._notify_conn.add_termination_listener(self._on_terminated)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Dropped malformed event on channel %s", channel)
+            return
+        self._dispatch(event)
+
+    def _on_terminated(self, connection) -> None:
+        # Closing the old connections during a reconnect also lands here.
+        if connection is self._listen_conn or connection is self._notify_conn:
+            logger.warning("Event bus connection lost; reconnecting")
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self) -> None:
+        if self._stopping or (self._reconnect_task is not None and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        await self._close_connections()
+        while not self._stopping:
+            try:
+                await self._connect()
+                return
+            except Exception:  # noqa: BLE001 - keep retrying until stopped
+                logger.exception("Event bus reconnect failed")
+                await self._close_connections()
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def publish(self, event: dict[str, Any]) -> None:
+        payload = json.dumps(event, separators=(",", ":"), default=str)
+        if len(payload.encode()) > PG_NOTIFY_MAX_BYTES:
+            logger.warning("Event too large for NOTIFY (%d bytes); delivering locally only", len(payload))
+            self._dispatch(event)
+            return
+        try:
+            async with self._notify_lock:
+                await self._notify_conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        except Exception:  # noqa: BLE001 - degrade to local delivery rather than failing the request
+            logger.exception("Event bus publish failed; delivering locally only")
+            self._dispatch(event)
+            self._schedule_reconnect()
+
+    async def _close_connections(self) -> None:
+        for conn in (self._listen_conn, self._notify_conn):
+            if conn is not None and not conn.is_closed():
+                try:
+                    await conn.close()
+                except Exception:  # noqa: BLE001 - closing a dead connection
+                    pass
+        self._listen_conn = self._notify_conn = None
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        await self._close_connections()
+
+
+def _asyncpg_dsn(database_url: str) -> str:
+    # SQLAlchemy URLs name the driver ("postgresql+asyncpg://"); asyncpg wants the plain scheme.
+    scheme, sep, rest = database_url.partition("://")
+    return f"{scheme.split('+', 1)[0]}{sep}{rest}"
+
+
+def create_event_bus() -> EventBus:
+    if settings.EVENT_BUS_BACKEND == "postgres":
+        return PostgresEventBus(settings.EVENT_BUS_DSN or _asyncpg_dsn(settings.DATABASE_URL), settings.EVENT_BUS_CHANNEL)
+    if settings.EVENT_BUS_BACKEND != "local":
+        raise ValueError(f"Unknown EVENT_BUS_BACKEND {settings.EVENT_BUS_BACKEND!r}; expected 'local' or 'postgres'")
+    return LocalEventBus()
+
+
+event_bus = create_event_bus()
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from decimal import ROUND_HALF_EVEN, Decimal
+
+from App.services.fee_handler import DEFAULT_TRADING_FEE_RATE
+from App.services.trading_engine import SettlementResult
+
+# Fees are quantized to 18 decimals, matching quantize_amount in fee_handler.
+FEE_DECIMALS = 18
+# Numeric values read back through a float column (SQLite) are off by ~1e-16 relative; closer than this counts as on the grid.
+GRID_TOLERANCE = Decimal("1e-15")
+
+
+def _step_parts(step: Decimal) -> tuple[int, int]:
+    """Split a positive step into (coefficient, decimals) so that step == coefficient * 10**-decimals."""
+    sign, digits, exponent = step.normalize().as_tuple()
+    if sign or step <= 0:
+        raise ValueError(f"Step must be positive, got {step}")
+    coefficient = int("".join(map(str, digits)))
+    if exponent >= 0:
+        return coefficient * 10**exponent, 0
+    return coefficient, -exponent
+
+
+def _from_atoms(value: int, decimals: int) -> Decimal:
+    # String construction is exact; Decimal arithmetic would round to the context precision.
+    return Decimal(f"{value}E-{decimals}")
+
+
+@dataclass(frozen=True)
+class FixedPointScale:
+    """Per-symbol tick (price step) and lot (amount step) for integer matching.
+
+    Prices and amounts become integer counts of ticks and lots on entry to the engine and
+    turn back into `Decimal` only when they leave it.
+    """
+
+    tick: Decimal
+    lot: Decimal
+
+    def __post_init__(self):
+        tick_coef, tick_decimals = _step_parts(self.tick)
+        lot_coef, lot_decimals = _step_parts(self.lot)
+        if tick_decimals > FEE_DECIMALS or lot_decimals > FEE_DECIMALS:
+            raise ValueError("Tick and lot sizes must have at most 18 decimal places")
+        object.__setattr__(self, "_tick", (tick_coef, tick_decimals))
+        object.__setattr__(self, "_lot", (lot_coef, lot_decimals))
+
+    @staticmethod
+    def _to_units(value: Decimal, step: Decimal, what: str) -> int:
+        units = (value / step).to_integral_value(ROUND_HALF_EVEN)
+        if abs(value - units * step) > abs(value) * GRID_TOLERANCE:
+            raise ValueError(f"{what} {value} is not a multiple of {step}")
+        return int(units)
+
+    def fits(self, price: Decimal, amount: Decimal) -> bool:
+        try:
+            self.price_to_units(price)
+            self.amount_to_units(amount)
+        except ValueError:
+            return False
+        return True
+
+    def snap_amount(self, amount: Decimal) -> Decimal:
+        """The exact on-grid amount for a value that may carry storage noise."""
+        return self.amount_from_units(self.amount_to_units(amount))
+
+    def price_to_units(self, price: Decimal) -> int:
+        return self._to_units(price, self.tick, "Price")
+
+    def amount_to_units(self, amount: Decimal) -> int:
+        return self._to_units(amount, self.lot, "Amount")
+
+    def price_from_units(self, units: int) -> Decimal:
+        coef, decimals = self._tick
+        return _from_atoms(units * coef, decimals)
+
+    def amount_from_units(self, units: int) -> Decimal:
+        coef, decimals = self._lot
+        return _from_atoms(units * coef, decimals)
+
+    def settle(self, price: Decimal, amount: Decimal, fee_rate: Decimal = DEFAULT_TRADING_FEE_RATE) -> SettlementResult:
+        """Integer-math equivalent of `settle_trade` for on-grid prices and amounts."""
+        return self.settle_units(self.price_to_units(price), self.amount_to_units(amount), fee_rate)
+
+    def settle_units(self, price_units: int, amount_units: int, fee_rate: Decimal = DEFAULT_TRADING_FEE_RATE) -> SettlementResult:
+        tick_coef, tick_decimals = self._tick
+        lot_coef, lot_decimals = self._lot
+        fee_num, fee_den = fee_rate.as_integer_ratio()
+
+        base = amount_units * lot_coef  # 10**-lot_decimals
+        quote_decimals = tick_decimals + lot_decimals
+        quote = price_units * tick_coef * base  # 10**-quote_decimals
+
+        # Floor division is ROUND_DOWN here because both operands are positive.
+        buyer_fee = base * fee_num * 10 ** (FEE_DECIMALS - lot_decimals) // fee_den if base > 0 else 0
+        seller_fee = quote * fee_num * 10**FEE_DECIMALS // (fee_den * 10**quote_decimals) if quote > 0 else 0
+
+        out_decimals = max(FEE_DECIMALS, quote_decimals)
+        seller_quote = quote * 10 ** (out_decimals - quote_decimals) - seller_fee * 10 ** (out_decimals - FEE_DECIMALS)
+
+        return SettlementResult(
+            buyer_base_delta=_from_atoms(base * 10 ** (FEE_DECIMALS - lot_decimals) - buyer_fee, FEE_DECIMALS),
+            buyer_quote_delta=_from_atoms(-quote, quote_decimals),
+            seller_base_delta=_from_atoms(-base, lot_decimals),
+            seller_quote_delta=_from_atoms(seller_quote, out_decimals),
+            buyer_fee=_from_atoms(buyer_fee, FEE_DECIMALS),
+            seller_fee=_from_atoms(seller_fee, FEE_DECIMALS),
+        )
+
+
+DEFAULT_SCALE = FixedPointScale(tick=Decimal("0.00000001"), lot=Decimal("0.00000001"))
+
+SYMBOL_SCALES: dict[str, FixedPointScale] = {
+    "BTCUSDT": FixedPointScale(tick=Decimal("0.01"), lot=Decimal("0.000001")),
+    "ETHUSDT": FixedPointScale(tick=Decimal("0.01"), lot=Decimal("0.0001")),
+    "LTCUSDT": FixedPointScale(tick=Decimal("0.01"), lot=Decimal("0.001")),
+    "BCHUSDT": FixedPointScale(tick=Decimal("0.01"), lot=Decimal("0.001")),
+}
+
+
+def scale_for(symbol: str) -> FixedPointScale:
+    return SYMBOL_SCALES.get(symbol, DEFAULT_SCALE)
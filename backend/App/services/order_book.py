@@ -0,0 +1,357 @@
+import asyncio
+from bisect import bisect_left, insort
+from collections import deque
+from decimal import Decimal
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from App.core.config import settings
+from App.core.logger import logger
+from App.models.order import Order
+from App.services.fixed_point import FixedPointScale, scale_for
+from App.services.trading_engine import MatchExecution, SimpleOrder
+
+
+def to_simple_order(order: Order) -> SimpleOrder:
+    return SimpleOrder(
+        id=order.id,
+        user_id=order.user_id,
+        side=order.side,
+        price=Decimal(order.price),
+        amount=Decimal(order.amount),
+        created_at_ts=order.created_at.timestamp(),
+    )
+
+
+class _Level:
+    """FIFO of orders at one price, with the live order count and total amount.
+
+    Cancels are lazy: `count` and `total` drop immediately, and the stale entry is
+    skipped and discarded once it reaches the head, so a cancel never scans the queue.
+    If stale entries come to outnumber live ones (churn behind a head that never
+    fills), the queue is rebuilt from its live orders, which keeps it within twice
+    the live count at amortised O(1) per cancel.
+    """
+
+    __slots__ = ("orders", "count", "total")
+
+    def __init__(self) -> None:
+        self.orders: deque[SimpleOrder] = deque()
+        self.count = 0
+        self.total = 0
+
+
+class OrderBook:
+    """Resting limit orders for one symbol, kept in price-time priority.
+
+    Each side is a dict of price level -> FIFO of orders plus a sorted list of
+    level keys, so matching only walks the crossing levels and cancels are
+    O(1) lookups by order id.
+
+    With a `FixedPointScale`, orders are converted to integer ticks and lots
+    on entry and the matching loop and its executions stay in those units;
+    settlement converts back to `Decimal` when it persists the fills.
+
+    `version` increases on every change, so depth snapshots are cached until
+    the book next changes. Changed levels are also collected until
+    `drain_changes`, which is what the order book feed publishes.
+    """
+
+    def __init__(self, symbol: str, scale: FixedPointScale | None = None):
+        self.symbol = symbol
+        self.scale = scale
+        self._levels: dict[str, dict[Decimal, _Level]] = {"buy": {}, "sell": {}}
+        # Level keys sorted ascending with the best price last: bids by price, asks by negated price.
+        self._keys: dict[str, list[Decimal]] = {"buy": [], "sell": []}
+        self._orders: dict[int, SimpleOrder] = {}
+        self.version = 0
+        self._snapshots: dict[int, dict] = {}
+        self._snapshot_version = -1
+        self._dirty: set[tuple[str, Decimal]] = set()
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: int) -> bool:
+        return order_id in self._orders
+
+    @staticmethod
+    def _key(side: str, price: Decimal) -> Decimal:
+        return price if side == "buy" else -price
+
+    def get(self, order_id: int) -> SimpleOrder | None:
+        """The resting record, in engine units when the book is scaled."""
+        return self._orders.get(order_id)
+
+    def price_out(self, price) -> Decimal:
+        return self.scale.price_from_units(price) if self.scale else price
+
+    def amount_out(self, amount) -> Decimal:
+        return self.scale.amount_from_units(amount) if self.scale else amount
+
+    def add(self, order: SimpleOrder) -> None:
+        if order.id in self._orders:
+            raise ValueError(f"Order {order.id} is already in the {self.symbol} book")
+        if self.scale is not None:
+            order = SimpleOrder(
+                id=order.id,
+                user_id=order.user_id,
+                side=order.side,
+                price=self.scale.price_to_units(order.price),
+                amount=self.scale.amount_to_units(order.amount),
+                created_at_ts=order.created_at_ts,
+            )
+        if order.amount <= 0:
+            return
+
+        levels = self._levels[order.side]
+        level = levels.get(order.price)
+        if level is None:
+            level = levels[order.price] = _Level()
+            insort(self._keys[order.side], self._key(order.side, order.price))
+
+        last = level.orders[-1] if level.orders else None
+        level.orders.append(order)
+        level.count += 1
+        level.total += order.amount
+        self._orders[order.id] = order
+        self.version += 1
+        self._dirty.add((order.side, order.price))
+
+        # Restores after a skipped settlement can arrive out of time order; keep the level FIFO.
+        if last is not None and (last.created_at_ts, last.id) > (order.created_at_ts, order.id):
+            live = sorted(self._live(level), key=lambda o: (o.created_at_ts, o.id))
+            level.orders = deque(live)
+
+    def _live(self, level: _Level) -> list[SimpleOrder]:
+        # A record removed and re-added can sit in the queue twice; only its first live entry counts.
+        seen: set[int] = set()
+        live = []
+        for o in level.orders:
+            if self._orders.get(o.id) is o and o.id not in seen:
+                seen.add(o.id)
+                live.append(o)
+        return live
+
+    def remove(self, order_id: int) -> SimpleOrder | None:
+        order = self._orders.pop(order_id, None)
+        if order is None:
+            return None
+
+        level = self._levels[order.side][order.price]
+        level.count -= 1
+        level.total -= order.amount
+        if level.count == 0:
+            self._drop_level(order.side, order.price)
+        elif len(level.orders) > 2 * level.count:
+            level.orders = deque(self._live(level))
+        self.version += 1
+        self._dirty.add((order.side, order.price))
+        return order
+
+    def _drop_level(self, side: str, price: Decimal) -> None:
+        del self._levels[side][price]
+        keys = self._keys[side]
+        del keys[bisect_left(keys, self._key(side, price))]
+
+    def sync(self, order: SimpleOrder, is_open: bool) -> None:
+        """Bring one order in line with its persisted state after settlement."""
+        if not is_open or order.amount <= 0:
+            self.remove(order.id)
+            return
+
+        current = self._orders.get(order.id)
+        if current is None:
+            self.add(order)
+        else:
+            amount = self.scale.amount_to_units(order.amount) if self.scale else order.amount
+            self._levels[current.side][current.price].total += amount - current.amount
+            current.amount = amount
+            self.version += 1
+            self._dirty.add((current.side, current.price))
+
+    def _best(self, side: str):
+        keys = self._keys[side]
+        if not keys:
+            return None
+        return self._key(side, keys[-1])
+
+    def best_price(self, side: str) -> Decimal | None:
+        best = self._best(side)
+        return None if best is None else self.price_out(best)
+
+    def best_bid(self) -> Decimal | None:
+        return self.best_price("buy")
+
+    def best_ask(self) -> Decimal | None:
+        return self.best_price("sell")
+
+    def _head(self, side: str) -> SimpleOrder:
+        orders = self._levels[side][self._best(side)].orders
+        while self._orders.get(orders[0].id) is not orders[0]:
+            orders.popleft()
+        return orders[0]
+
+    def levels(self, side: str) -> Iterator[tuple[Decimal, list[SimpleOrder]]]:
+        """Yield (price, orders) from the best level outwards, in engine units."""
+        levels = self._levels[side]
+        for key in reversed(self._keys[side]):
+            price = self._key(side, key)
+            yield price, self._live(levels[price])
+
+    def depth(self, side: str, limit: int | None = None) -> list[tuple[Decimal, Decimal, int]]:
+        """(price, total amount, order count) for up to `limit` levels from the best outwards."""
+        levels = self._levels[side]
+        keys = self._keys[side] if limit is None else self._keys[side][-limit:]
+        out = []
+        for key in reversed(keys):
+            price = self._key(side, key)
+            level = levels[price]
+            out.append((self.price_out(price), self.amount_out(level.total), level.count))
+        return out
+
+    def snapshot(self, depth: int | None = None) -> dict[str, list[dict]]:
+        """Aggregated bids and asks, rebuilt at most once per book version and depth (None for all levels)."""
+        if self._snapshot_version != self.version:
+            self._snapshots.clear()
+            self._snapshot_version = self.version
+        snapshot = self._snapshots.get(depth)
+        if snapshot is None:
+            snapshot = self._snapshots[depth] = {
+                name: [{"price": str(price), "amount": str(amount), "orders": count} for price, amount, count in self.depth(side, depth)]
+                for name, side in (("bids", "buy"), ("asks", "sell"))
+            }
+        return snapshot
+
+    def drain_changes(self) -> dict[str, list[tuple[Decimal, Decimal, int]]]:
+        """Current (price, total amount, order count) of every level changed since the last drain.
+
+        Removed levels are reported with a zero amount and count; each side is sorted best price first.
+        """
+        changes: dict[str, list] = {"buy": [], "sell": []}
+        for side, price in self._dirty:
+            level = self._levels[side].get(price)
+            if level is None:
+                changes[side].append((price, Decimal("0"), 0))
+            else:
+                changes[side].append((price, self.amount_out(level.total), level.count))
+        self._dirty.clear()
+        for side, changed in changes.items():
+            changed.sort(key=lambda change: change[0], reverse=side == "buy")
+            changes[side] = [(self.price_out(price), amount, count) for price, amount, count in changed]
+        return changes
+
+    def _fill(self, order: SimpleOrder, amount: Decimal) -> None:
+        order.amount -= amount
+        self._levels[order.side][order.price].total -= amount
+        self.version += 1
+        self._dirty.add((order.side, order.price))
+        if order.amount == 0:
+            self.remove(order.id)
+
+    def match(self) -> list[MatchExecution]:
+        """Cross resting bids and asks until the book is no longer crossed, at the sell price.
+
+        Executions are in engine units when the book is scaled.
+        """
+        matches: list[MatchExecution] = []
+        bid_keys, ask_keys = self._keys["buy"], self._keys["sell"]
+        while bid_keys and ask_keys:
+            if bid_keys[-1] < -ask_keys[-1]:
+                break
+
+            b = self._head("buy")
+            s = self._head("sell")
+            fill_amount = min(b.amount, s.amount)
+            matches.append(MatchExecution(buy_order_id=b.id, sell_order_id=s.id, price=s.price, amount=fill_amount))
+
+            self._fill(b, fill_amount)
+            self._fill(s, fill_amount)
+
+        return matches
+
+    def submit(self, order: SimpleOrder) -> list[MatchExecution]:
+        """Add an incoming order and match it against the opposite side at resting prices."""
+        self.add(order)
+        return self.cross(order.id)
+
+    def cross(self, order_id: int) -> list[MatchExecution]:
+        """Match one order, and no other, against the opposite side until it fills or stops crossing."""
+        taker = self._orders.get(order_id)
+        if taker is None:
+            return []
+        opposite = "sell" if taker.side == "buy" else "buy"
+        matches: list[MatchExecution] = []
+        while self._orders.get(order_id) is taker and self._keys[opposite]:
+            best = self._best(opposite)
+            if taker.price < best if taker.side == "buy" else taker.price > best:
+                break
+
+            maker = self._head(opposite)
+            fill_amount = min(taker.amount, maker.amount)
+            b, s = (taker, maker) if taker.side == "buy" else (maker, taker)
+            matches.append(MatchExecution(buy_order_id=b.id, sell_order_id=s.id, price=maker.price, amount=fill_amount))
+
+            self._fill(taker, fill_amount)
+            self._fill(maker, fill_amount)
+
+        return matches
+
+
+async def load_order_book(db: AsyncSession, symbol: str) -> OrderBook:
+    result = await db.execute(
+        select(Order).where(Order.symbol == symbol, Order.status == "open").order_by(Order.created_at.asc(), Order.id.asc())
+    )
+    orders = [to_simple_order(order) for order in result.scalars().all()]
+    scale = scale_for(symbol) if settings.MATCHING_FIXED_POINT else None
+    if scale is not None:
+        # Open orders placed before fixed-point matching may sit off the tick/lot grid.
+        off_grid = [o.id for o in orders if not scale.fits(o.price, o.amount)]
+        if off_grid:
+            logger.warning(
+                "%d open %s orders are off the %s tick / %s lot grid (first id %d); matching this symbol with Decimal",
+                len(off_grid), symbol, scale.tick, scale.lot, off_grid[0],
+            )
+            scale = None
+    book = OrderBook(symbol, scale)
+    for order in orders:
+        book.add(order)
+    return book
+
+
+class OrderBookRegistry:
+    """Process-wide books, warmed lazily from the orders table on first use."""
+
+    def __init__(self) -> None:
+        self._books: dict[str, OrderBook] = {}
+        self._warm_locks: dict[str, asyncio.Lock] = {}
+
+    async def get(self, db: AsyncSession, symbol: str) -> OrderBook:
+        book = self._books.get(symbol)
+        if book is not None:
+            return book
+
+        lock = self._warm_locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            book = self._books.get(symbol)
+            if book is None:
+                book = await load_order_book(db, symbol)
+                self._books[symbol] = book
+        return book
+
+    def peek(self, symbol: str) -> OrderBook | None:
+        """The loaded book, without warming it."""
+        return self._books.get(symbol)
+
+    def invalidate(self, symbol: str) -> None:
+        """Drop a book so the next access reloads it from the database."""
+        self._books.pop(symbol, None)
+
+    def clear(self) -> None:
+        self._books.clear()
+        self._warm_locks.clear()
+
+
+order_books = OrderBookRegistry()
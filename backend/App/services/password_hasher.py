@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from App.core.config import settings
+from App.core.security import get_password_hash, verify_password
+from App.services.stats import CommandStats
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Runs password hashing and verification on a bounded thread pool.
+
+    pbkdf2 (hashlib) and bcrypt release the GIL while they work, so threads hash in
+    parallel and the event loop keeps serving other requests. With more hashes
+    than `workers`, the extra ones wait in the pool's queue; that wait is recorded
+    separately from the hashing time.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.queue_wait = CommandStats()
+        self.run_time = CommandStats()
+        self.rehashed = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _timed(self, fn: Callable[..., T], enqueued_at: float, *args: Any) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self.queue_wait.record(started - enqueued_at, False)
+        failed = True
+        try:
+            result = fn(*args)
+            failed = False
+            return result
+        finally:
+            with self._lock:
+                self.run_time.record(time.perf_counter() - started, failed)
+                self._pending -= 1
+
+    async def _submit(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            self._pending += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), self._timed, fn, time.perf_counter(), *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, password, hashed_password)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "queue_wait": self.queue_wait.summary(),
+                "hashing": self.run_time.summary(),
+                "rehashed": self.rehashed,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(workers=settings.PASSWORD_HASH_WORKERS)
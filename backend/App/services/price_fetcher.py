@@ -0,0 +1,130 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from App.core.config import settings
+from App.core.logger import logger
+
+COIN_MAP = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "LTC": "litecoin",
+    "BCH": "bitcoin-cash",
+    "USDT": "tether",
+    "SOL": "solana",
+    "XRP": "ripple",
+    "ADA": "cardano",
+}
+
+
+@dataclass(frozen=True)
+class PriceSnapshot:
+    prices: dict[str, float | None]
+    fetched_at: float  # epoch seconds
+
+    def age(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+
+class PriceFetcher:
+    """Keeps the last good upstream price snapshot in memory, refreshed in the background.
+
+    One pooled client and one refresh loop per process: requests read the snapshot
+    and never wait on the upstream API, except for the very first one. Failed
+    refreshes keep the previous snapshot, which then ages into being stale.
+    """
+
+    def __init__(self, url: str, interval: float, timeout: float = 10.0, transport: httpx.AsyncBaseTransport | None = None):
+        self.url = url
+        self.interval = interval
+        self.timeout = timeout
+        self.transport = transport
+        self.snapshot: PriceSnapshot | None = None
+        self.last_error: str | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._task: asyncio.Task | None = None
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def is_stale(self) -> bool:
+        # One missed refresh is tolerated; two means the upstream is not answering.
+        return self.snapshot is None or self.snapshot.age() > 2 * self.interval
+
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Clients, locks and tasks belong to one event loop (each TestClient gets its own).
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            transport=self.transport,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+        )
+        self._task = None
+
+    def start(self) -> None:
+        self._bind()
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._run())
+
+    async def refresh(self, max_age: float | None = None) -> PriceSnapshot | None:
+        """Fetch a new snapshot, unless the current one is younger than `max_age` seconds."""
+        self._bind()
+        async with self._lock:
+            # Concurrent callers queue on the lock; the first fetch satisfies the rest.
+            if max_age is not None and self.snapshot is not None and self.snapshot.age() < max_age:
+                return self.snapshot
+            try:
+                response = await self._client.get(self.url, params={"ids": ",".join(COIN_MAP.values()), "vs_currencies": "usd"})
+                response.raise_for_status()
+                payload = response.json()
+            except (httpx.HTTPError, ValueError) as exc:
+                self.last_error = f"{exc.__class__.__name__}: {exc}"
+                logger.warning("Price refresh failed: %s", self.last_error)
+                return self.snapshot
+
+            self.snapshot = PriceSnapshot(
+                prices={symbol: payload.get(coin_id, {}).get("usd") for symbol, coin_id in COIN_MAP.items()},
+                fetched_at=time.time(),
+            )
+            self.last_error = None
+            return self.snapshot
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh(max_age=self.interval / 2)
+            await asyncio.sleep(self.interval)
+
+    def current(self) -> PriceSnapshot | None:
+        """The current snapshot, possibly None, starting the refresh loop without waiting for its first fetch."""
+        self.start()
+        return self.snapshot
+
+    async def latest(self) -> PriceSnapshot | None:
+        """The current snapshot, starting the refresh loop and waiting for its first fetch if needed."""
+        self.start()
+        if self.snapshot is None:
+            await self.refresh(max_age=self.interval / 2)
+        return self.snapshot
+
+    async def stop(self) -> None:
+        task, client = self._task, self._client
+        self._task = self._client = self._loop = None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if client is not None:
+            try:
+                await client.aclose()
+            except RuntimeError:
+                pass  # bound to a loop that is already closed
+
+
+price_fetcher = PriceFetcher(url=settings.PRICE_FEED_URL, interval=settings.PRICE_UPDATE_INTERVAL)
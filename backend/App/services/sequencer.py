@@ -0,0 +1,115 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, TypeVar
+
+from App.core.config import settings
+from App.core.logger import logger
+from App.services.stats import CommandStats
+
+T = TypeVar("T")
+
+
+class SequencerBusy(Exception):
+    """Raised when a symbol's inbound queue is full."""
+
+
+@dataclass
+class _Command:
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float
+
+
+@dataclass
+class _Lane:
+    queue: asyncio.Queue
+    task: asyncio.Task
+    loop: asyncio.AbstractEventLoop
+    stats: dict[str, CommandStats] = field(default_factory=dict)
+
+
+class MatchingSequencer:
+    """Single writer per symbol: one asyncio task drains one inbound queue per symbol.
+
+    Commands for a symbol (place, cancel, match) run strictly in submission order, so
+    the book and its settlement never interleave, while lanes for different symbols run
+    concurrently. Latency is measured from enqueue to completion, so it includes queueing.
+    """
+
+    def __init__(self, max_depth: int = 0):
+        self.max_depth = max_depth
+        self._lanes: dict[str, _Lane] = {}
+
+    def _lane(self, symbol: str) -> _Lane:
+        loop = asyncio.get_running_loop()
+        lane = self._lanes.get(symbol)
+        if lane is None or lane.task.done() or lane.loop is not loop:
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_depth)
+            lane = _Lane(queue=queue, task=loop.create_task(self._drain(symbol, queue)), loop=loop)
+            self._lanes[symbol] = lane
+        return lane
+
+    async def submit(self, symbol: str, run: Callable[[], Awaitable[T]], name: str = "command") -> T:
+        lane = self._lane(symbol)
+        command = _Command(name=name, run=run, future=asyncio.get_running_loop().create_future(), enqueued_at=time.perf_counter())
+        try:
+            lane.queue.put_nowait(command)
+        except asyncio.QueueFull as exc:
+            raise SequencerBusy(f"Matching queue for {symbol} is full") from exc
+        return await command.future
+
+    async def _drain(self, symbol: str, queue: asyncio.Queue) -> None:
+        while True:
+            command: _Command = await queue.get()
+            try:
+                if command.future.cancelled():
+                    continue
+                failed = False
+                try:
+                    result = await command.run()
+                except asyncio.CancelledError:
+                    command.future.cancel()
+                    raise
+                except Exception as exc:  # noqa: BLE001 - handed back to the submitter
+                    failed = True
+                    if not command.future.cancelled():
+                        command.future.set_exception(exc)
+                else:
+                    if not command.future.cancelled():
+                        command.future.set_result(result)
+                lane = self._lanes.get(symbol)
+                if lane is not None:
+                    stats = lane.stats.setdefault(command.name, CommandStats())
+                    stats.record(time.perf_counter() - command.enqueued_at, failed)
+            finally:
+                queue.task_done()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            symbol: {
+                "queue_depth": lane.queue.qsize(),
+                "commands": {name: s.summary() for name, s in lane.stats.items()},
+            }
+            for symbol, lane in self._lanes.items()
+        }
+
+    async def shutdown(self) -> None:
+        lanes = list(self._lanes.values())
+        self._lanes.clear()
+        for lane in lanes:
+            lane.task.cancel()
+            while not lane.queue.empty():
+                lane.queue.get_nowait().future.cancel()
+        for lane in lanes:
+            if lane.loop is asyncio.get_running_loop():
+                try:
+                    await lane.task
+                except asyncio.CancelledError:
+                    pass
+                except Exception:  # noqa: BLE001 - shutdown should not fail on a broken lane
+                    logger.exception("Matching lane crashed during shutdown")
+
+
+sequencer = MatchingSequencer(max_depth=settings.MATCHING_QUEUE_MAX_DEPTH)
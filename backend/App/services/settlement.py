@@ -0,0 +1,191 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from App.models.balance import Balance
+from App.models.order import Order
+from App.models.trade import Trade
+from App.models.transaction import Transaction
+from App.services.candles import OHLCV, aggregate, write_rollups
+from App.services.fee_handler import DEFAULT_TRADING_FEE_RATE
+from App.services.fixed_point import FixedPointScale
+from App.services.trading_engine import MatchExecution, SimpleOrder, settle_trade
+
+
+@dataclass
+class SettledOrder:
+    order: SimpleOrder
+    status: str
+
+
+@dataclass
+class BatchSettlement:
+    executed: list[MatchExecution] = field(default_factory=list)
+    orders: dict[int, SettledOrder] = field(default_factory=dict)
+    executed_at: datetime | None = None
+    # This batch's contribution to each candle interval, for the in-memory aggregator after commit.
+    candles: dict[str, OHLCV] = field(default_factory=dict)
+
+
+_balances = Balance.__table__
+_orders = Order.__table__
+
+_apply_balance_delta = (
+    update(_balances).where(_balances.c.id == bindparam("b_id")).values(amount=_balances.c.amount + bindparam("delta"))
+)
+_apply_order_fill = (
+    update(_orders)
+    .where(_orders.c.id == bindparam("o_id"), _orders.c.status == "open")
+    .values(amount=bindparam("remaining"), status=bindparam("new_status"))
+)
+
+
+async def _load_balances(db: AsyncSession, user_ids: set[int], coins: tuple[str, str]) -> dict[tuple[int, str], tuple[int, Decimal]]:
+    result = await db.execute(
+        select(Balance.id, Balance.user_id, Balance.coin, Balance.amount).where(Balance.user_id.in_(user_ids), Balance.coin.in_(coins))
+    )
+    balances = {(row.user_id, row.coin): (row.id, Decimal(row.amount)) for row in result}
+
+    missing = [{"user_id": uid, "coin": coin, "amount": Decimal("0")} for uid in user_ids for coin in coins if (uid, coin) not in balances]
+    if missing:
+        created = await db.execute(insert(Balance).returning(Balance.id, Balance.user_id, Balance.coin), missing)
+        for row in created:
+            balances[(row.user_id, row.coin)] = (row.id, Decimal("0"))
+    return balances
+
+
+async def settle_matches(
+    db: AsyncSession,
+    matches: list[MatchExecution],
+    base_coin: str,
+    quote_coin: str,
+    fee_rate: Decimal = DEFAULT_TRADING_FEE_RATE,
+    scale: FixedPointScale | None = None,
+) -> BatchSettlement:
+    """Settle a batch of executions with a fixed number of statements, independent of fill count.
+
+    Touched orders and balances are loaded once, the `settle_trade` deltas are applied in
+    memory, and balances, orders, ledger rows, trades and candle rollups are written back
+    with one bulk statement each. With a `scale`, executions are taken in engine units and fees are computed
+    with integer math. The caller owns the transaction and commits.
+
+    An execution whose buyer or seller cannot fund it is skipped and the unfunded order is
+    cancelled, so it does not go back into the book still crossing the other side. One larger
+    than either order's stored remainder is skipped, and the caller re-syncs both orders from
+    their rows.
+    """
+    batch = BatchSettlement()
+    if not matches:
+        return batch
+
+    order_ids = {m.buy_order_id for m in matches} | {m.sell_order_id for m in matches}
+    order_result = await db.execute(
+        select(Order.id, Order.user_id, Order.side, Order.price, Order.amount, Order.status, Order.created_at).where(Order.id.in_(order_ids))
+    )
+    batch.orders = {
+        row.id: SettledOrder(
+            order=SimpleOrder(
+                id=row.id,
+                user_id=row.user_id,
+                side=row.side,
+                price=Decimal(row.price),
+                # A scaled book's fills are exact lots; drop any float noise from the stored remainder.
+                amount=scale.snap_amount(Decimal(row.amount)) if scale is not None else Decimal(row.amount),
+                created_at_ts=row.created_at.timestamp(),
+            ),
+            status=row.status,
+        )
+        for row in order_result
+    }
+
+    balances = await _load_balances(db, {s.order.user_id for s in batch.orders.values()}, (base_coin, quote_coin))
+    available = {key: amount for key, (_, amount) in balances.items()}
+    deltas: dict[tuple[int, str], Decimal] = {}
+    touched_ids: set[int] = set()
+    ledger: list[dict] = []
+    now = datetime.now(timezone.utc)
+
+    def apply(key: tuple[int, str], delta: Decimal) -> None:
+        available[key] += delta
+        deltas[key] = deltas.get(key, Decimal("0")) + delta
+
+    for m in matches:
+        buy = batch.orders[m.buy_order_id]
+        sell = batch.orders[m.sell_order_id]
+        if buy.status != "open" or sell.status != "open":
+            # Cancelled as unfunded earlier in this batch.
+            continue
+        buy_order, sell_order = buy.order, sell.order
+        buyer_quote = (buy_order.user_id, quote_coin)
+        seller_base = (sell_order.user_id, base_coin)
+
+        if scale is not None:
+            # Scaled books emit executions in ticks/lots; this is where they become Decimal again.
+            settlement = scale.settle_units(m.price, m.amount, fee_rate)
+            m = MatchExecution(
+                buy_order_id=m.buy_order_id,
+                sell_order_id=m.sell_order_id,
+                price=scale.price_from_units(m.price),
+                amount=scale.amount_from_units(m.amount),
+            )
+        else:
+            settlement = settle_trade(price=m.price, amount=m.amount, fee_rate=fee_rate)
+
+        # The book disagrees with the stored remainder (another writer got there first): trust the row.
+        if m.amount > buy_order.amount or m.amount > sell_order.amount:
+            continue
+
+        buyer_short = available[buyer_quote] < -settlement.buyer_quote_delta
+        seller_short = available[seller_base] < -settlement.seller_base_delta
+        if buyer_short or seller_short:
+            for settled, short in ((buy, buyer_short), (sell, seller_short)):
+                if short:
+                    settled.status = "cancelled"
+                    touched_ids.add(settled.order.id)
+            continue
+
+        apply(buyer_quote, settlement.buyer_quote_delta)
+        apply((buy_order.user_id, base_coin), settlement.buyer_base_delta)
+        apply(seller_base, settlement.seller_base_delta)
+        apply((sell_order.user_id, quote_coin), settlement.seller_quote_delta)
+
+        for settled in (buy, sell):
+            settled.order.amount -= m.amount
+            settled.status = "filled" if settled.order.amount == 0 else "open"
+            touched_ids.add(settled.order.id)
+
+        ledger.append(
+            {"user_id": buy_order.user_id, "coin": base_coin, "amount": settlement.buyer_base_delta, "type": "trade_buy", "status": "completed", "created_at": now}
+        )
+        ledger.append(
+            {"user_id": sell_order.user_id, "coin": quote_coin, "amount": settlement.seller_quote_delta, "type": "trade_sell", "status": "completed", "created_at": now}
+        )
+        batch.executed.append(m)
+
+    if touched_ids:
+        await db.execute(
+            _apply_order_fill,
+            [{"o_id": oid, "remaining": batch.orders[oid].order.amount, "new_status": batch.orders[oid].status} for oid in touched_ids],
+        )
+    if not batch.executed:
+        return batch
+
+    # Deltas rather than absolute values, so concurrent deposits to the same rows are not overwritten.
+    await db.execute(_apply_balance_delta, [{"b_id": balances[key][0], "delta": delta} for key, delta in deltas.items()])
+    await db.execute(insert(Transaction), ledger)
+
+    symbol = f"{base_coin}{quote_coin}"
+    await db.execute(
+        insert(Trade),
+        [
+            {"symbol": symbol, "price": m.price, "amount": m.amount, "buy_order_id": m.buy_order_id, "sell_order_id": m.sell_order_id, "created_at": now}
+            for m in batch.executed
+        ],
+    )
+    batch.executed_at = now
+    batch.candles = aggregate(batch.executed, now)
+    await write_rollups(db, symbol, batch.candles)
+    return batch
@@ -0,0 +1,35 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+LATENCY_SAMPLES = 1024
+
+
+@dataclass
+class CommandStats:
+    count: int = 0
+    errors: int = 0
+    max_seconds: float = 0.0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def record(self, seconds: float, failed: bool) -> None:
+        self.count += 1
+        self.errors += int(failed)
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.samples.append(seconds)
+
+    def summary(self) -> dict[str, Any]:
+        ordered = sorted(self.samples)
+
+        def pct(q: float) -> float | None:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "max_ms": round(self.max_seconds * 1000, 3),
+        }
@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from App.core.config import settings
+from App.models.trade import Trade
+from App.services.order_book import order_books
+
+
+@dataclass(slots=True)
+class Ticker:
+    symbol: str
+    best_bid: Decimal | None = None
+    best_ask: Decimal | None = None
+    last_price: Decimal | None = None
+    last_trade_at: datetime | None = None
+
+    @property
+    def mid(self) -> Decimal | None:
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def reference_price(self) -> Decimal | None:
+        """Last trade, or the mid when the symbol has not traded."""
+        return self.last_price if self.last_price is not None else self.mid
+
+    def as_dict(self) -> dict:
+        def out(value: Decimal | None) -> str | None:
+            return None if value is None else str(value)
+
+        return {
+            "symbol": self.symbol,
+            "best_bid": out(self.best_bid),
+            "best_ask": out(self.best_ask),
+            "mid": out(self.mid),
+            "last_price": out(self.last_price),
+            "reference_price": out(self.reference_price),
+            "last_trade_at": self.last_trade_at.isoformat() if self.last_trade_at else None,
+        }
+
+
+def supported_symbols() -> list[str]:
+    return [f"{coin}USDT" for coin in settings.SUPPORTED_CURRENCIES if coin != "USDT"]
+
+
+class TickerIndex:
+    """Best bid/ask and last trade per symbol, maintained by the matching engine.
+
+    Quotes are refreshed after every sequenced book command and the last trade
+    after every committed settlement, so reads are dictionary lookups.
+    """
+
+    def __init__(self) -> None:
+        self._tickers: dict[str, Ticker] = {}
+        self._warm: set[str] = set()
+        self._tape_read: set[str] = set()
+
+    def _ticker(self, symbol: str) -> Ticker:
+        ticker = self._tickers.get(symbol)
+        if ticker is None:
+            ticker = self._tickers[symbol] = Ticker(symbol)
+        return ticker
+
+    def update_quotes(self, symbol: str, best_bid: Decimal | None, best_ask: Decimal | None) -> None:
+        ticker = self._ticker(symbol)
+        ticker.best_bid = best_bid
+        ticker.best_ask = best_ask
+
+    def record_trade(self, symbol: str, price: Decimal, at: datetime) -> None:
+        ticker = self._ticker(symbol)
+        # A warm-up reading an older trade must not overwrite a newer live one.
+        if ticker.last_trade_at is None or at >= ticker.last_trade_at:
+            ticker.last_price = price
+            ticker.last_trade_at = at
+
+    async def _read_tape(self, db: AsyncSession, symbol: str) -> None:
+        result = await db.execute(
+            select(Trade.price, Trade.created_at).where(Trade.symbol == symbol).order_by(Trade.created_at.desc(), Trade.id.desc()).limit(1)
+        )
+        last = result.first()
+        if last is not None:
+            at = last.created_at if last.created_at.tzinfo else last.created_at.replace(tzinfo=timezone.utc)
+            self.record_trade(symbol, Decimal(last.price), at)
+        self._tape_read.add(symbol)
+
+    async def warm_trades(self, db: AsyncSession, symbols: list[str]) -> None:
+        """Load the last trade from the trade tape for symbols not seen since startup, leaving their books alone."""
+        for symbol in symbols:
+            if symbol not in self._tape_read:
+                await self._read_tape(db, symbol)
+
+    async def warm(self, db: AsyncSession, symbols: list[str]) -> None:
+        """Load quotes and the last trade for symbols not seen since startup."""
+        for symbol in symbols:
+            if symbol in self._warm:
+                continue
+            book = await order_books.get(db, symbol)
+            self.update_quotes(symbol, book.best_bid(), book.best_ask())
+            if symbol not in self._tape_read:
+                await self._read_tape(db, symbol)
+            self._warm.add(symbol)
+
+    def get(self, symbol: str) -> Ticker | None:
+        return self._tickers.get(symbol)
+
+    def clear(self) -> None:
+        self._tickers.clear()
+        self._warm.clear()
+        self._tape_read.clear()
+
+
+ticker_index = TickerIndex()
@@ -5,7 +5,8 @@ from typing import Iterable
 from App.services.fee_handler import calculate_trading_fee
 
 
-@dataclass
+# Slotted: a book holds one of these per resting order, so skipping the per-instance __dict__ matters.
+@dataclass(slots=True)
 class SimpleOrder:
     id: int
     user_id: int
@@ -15,7 +16,7 @@ class SimpleOrder:
     created_at_ts: float
 
 
-@dataclass
+@dataclass(slots=True)
 class MatchExecution:
     buy_order_id: int
     sell_order_id: int
@@ -23,7 +24,7 @@ class MatchExecution:
     amount: Decimal
 
 
-@dataclass
+@dataclass(slots=True)
 class SettlementResult:
     buyer_base_delta: Decimal
     buyer_quote_delta: Decimal
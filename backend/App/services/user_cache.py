@@ -0,0 +1,62 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from App.core.config import settings
+from App.models.user import User
+
+_COLUMNS = tuple(attr.key for attr in User.__mapper__.column_attrs)
+
+
+class UserCache:
+    """Authenticated users by token subject (email), for at most `ttl` seconds.
+
+    Entries hold column values, not ORM instances, so no object is shared between
+    sessions. A hit is attached to the request's session without a SELECT, and the
+    handler can modify and commit it as usual. Changes made by this process
+    invalidate the entry at once. Changes made elsewhere, such as another worker or
+    a manual UPDATE, show up within `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, db: AsyncSession, subject: str) -> User | None:
+        entry = self._entries.get(subject)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[subject]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(subject)
+        self.hits += 1
+        user = User(**entry[1])
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+    def put(self, subject: str, user: User) -> None:
+        if self.ttl <= 0:
+            return
+        self._entries[subject] = (time.monotonic() + self.ttl, {key: getattr(user, key) for key in _COLUMNS})
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *subjects: str) -> None:
+        for subject in subjects:
+            self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_TTL_SECONDS, settings.AUTH_USER_CACHE_MAX_ENTRIES)
@@ -0,0 +1,42 @@
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def newest_first(stmt: Select, created_at_col, id_col, cursor: str | None) -> Select:
+    """Order by (created_at, id) descending and resume after `cursor`, if given.
+
+    Keyset pagination: each page is an index range scan that starts where the
+    previous one stopped, so page N costs the same as page 1.
+    """
+    if cursor is not None:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(created_at_col, id_col) < tuple_(created_at, row_id))
+    return stmt.order_by(created_at_col.desc(), id_col.desc())
+
+
+def page(rows: list, limit: int, response: Response) -> list:
+    """Trim a `limit + 1` fetch to `limit` rows and set the next-page cursor header when there is more."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows
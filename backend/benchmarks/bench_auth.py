@@ -0,0 +1,153 @@
+"""Cost of authenticating a request: JWT verification and the user lookup, cached and uncached.
+
+Two measurements:
+
+* decode: `decode_access_token` calls per second for one reused token, with the
+  verified-token cache off and on.
+* api: requests per second on authenticated endpoints (`GET /users/me`,
+  `GET /wallet/balances`) through the in-process ASGI app, run three ways: no caches,
+  the token cache only, and the token and user caches together.
+
+With --rounds, it also times one pbkdf2_sha256 hash at each round count, to pick
+PASSWORD_PBKDF2_ROUNDS for a login latency budget.
+
+Run from backend/:
+
+    python -m benchmarks.bench_auth --requests 3000 --concurrency 16
+    python -m benchmarks.bench_auth --rounds 29000,100000,300000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from passlib.hash import pbkdf2_sha256
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.load_api import EndpointStats, seed
+from App.core.config import settings
+from App.core.security import create_access_token, decode_access_token, verified_tokens
+from App.database import get_db
+from App.main import app
+from App.models import Base
+from App.services.user_cache import user_cache
+
+ENDPOINTS = {"me": "/api/v1/users/me", "balances": "/api/v1/wallet/balances"}
+VARIANTS = {
+    "uncached": (False, False),
+    "token cache": (True, False),
+    "token + user cache": (True, True),
+}
+
+
+def _configure(token_cache: bool, user_cache_on: bool) -> None:
+    verified_tokens.clear()
+    verified_tokens.max_entries = settings.JWT_CACHE_MAX_ENTRIES if token_cache else 0
+    user_cache.clear()
+    user_cache.ttl = settings.AUTH_USER_CACHE_TTL_SECONDS if user_cache_on else 0
+
+
+def bench_decode(calls: int) -> dict[str, float]:
+    token = create_access_token({"sub": "bench@example.com", "role": "user"})
+    rates = {}
+    for name, enabled in (("uncached", False), ("cached", True)):
+        _configure(enabled, False)
+        started = time.perf_counter()
+        for _ in range(calls):
+            decode_access_token(token)
+        rates[name] = calls / (time.perf_counter() - started)
+    return rates
+
+
+def bench_rounds(rounds: list[int], samples: int = 5) -> dict[int, float]:
+    """Median milliseconds per pbkdf2_sha256 hash at each round count."""
+    timings = {}
+    for count in rounds:
+        hasher = pbkdf2_sha256.using(rounds=count)
+        runs = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            hasher.hash("BenchPass1")
+            runs.append((time.perf_counter() - started) * 1000)
+        timings[count] = statistics.median(runs)
+    return timings
+
+
+async def _drive(client: httpx.AsyncClient, tokens: list[str], requests: int, concurrency: int, seed_value: int) -> tuple[dict[str, EndpointStats], float]:
+    stats = {name: EndpointStats() for name in ENDPOINTS}
+    remaining = requests
+
+    async def worker(worker_id: int) -> None:
+        nonlocal remaining
+        rng = random.Random(seed_value + worker_id)
+        while remaining > 0:
+            remaining -= 1
+            name = rng.choice(list(ENDPOINTS))
+            started = time.perf_counter()
+            response = await client.get(ENDPOINTS[name], headers={"Authorization": f"Bearer {rng.choice(tokens)}"})
+            stats[name].record(time.perf_counter() - started, response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return stats, time.perf_counter() - started
+
+
+async def bench_api(args: argparse.Namespace) -> dict[str, tuple[dict[str, EndpointStats], float]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'auth.db'}")
+        session_local = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def override_get_db():
+            async with session_local() as session:
+                yield session
+
+        results = {}
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            tokens = await seed(session_local, args.users, 0, "BTCUSDT", None, random.Random(args.seed))
+            app.dependency_overrides[get_db] = override_get_db
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://auth.test") as client:
+                for name, (token_cache, user_cache_on) in VARIANTS.items():
+                    _configure(token_cache, user_cache_on)
+                    results[name] = await _drive(client, tokens, args.requests, args.concurrency, args.seed)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            _configure(True, True)
+            await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50_000, help="decode_access_token calls per variant")
+    parser.add_argument("--requests", type=int, default=3000, help="API requests per variant")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--rounds", help="comma-separated pbkdf2 round counts to time, e.g. 29000,100000")
+    args = parser.parse_args()
+
+    if args.rounds:
+        for count, ms in bench_rounds([int(r) for r in args.rounds.split(",")]).items():
+            print(f"pbkdf2_sha256 rounds={count:<8} {ms:8.1f} ms/hash")
+        print()
+
+    rates = bench_decode(args.calls)
+    print(f"decode_access_token: {rates['uncached']:,.0f}/s uncached, {rates['cached']:,.0f}/s cached ({rates['cached'] / rates['uncached']:.1f}x)")
+
+    print(f"\n{'variant':<20}{'endpoint':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for variant, (stats, elapsed) in asyncio.run(bench_api(args)).items():
+        total = sum(len(s.latencies) for s in stats.values())
+        print(f"{variant:<20}{'all':<10}{total / elapsed:>10.1f}")
+        for name, s in stats.items():
+            summary = s.summary(elapsed)
+            print(f"{'':<20}{name:<10}{summary['rps']:>10}{summary['p50_ms']:>10}{summary['p99_ms']:>10}{summary['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
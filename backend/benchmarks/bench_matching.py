@@ -0,0 +1,187 @@
+"""Matching engine microbenchmarks: book submits, batch match_orders, settle_trade and fees.
+
+Run from backend/:
+
+    python -m benchmarks.bench_matching
+    python -m benchmarks.bench_matching --depth 2000 --resting 200000 --crossing-ratio 0.5 --size uniform
+
+To compare two engine builds, run the suite in each checkout with --save and then
+compare, which exits non-zero on a regression beyond --tolerance:
+
+    python -m benchmarks.bench_matching --save /tmp/base.json        # on the base checkout
+    python -m benchmarks.bench_matching --compare /tmp/base.json     # on the candidate
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, replace
+from decimal import Decimal
+
+from App.services.fee_handler import calculate_trading_fee
+from App.services.fixed_point import scale_for
+from App.services.order_book import OrderBook
+from App.services.trading_engine import match_orders, settle_trade
+from benchmarks.synthetic import SIZE_DISTRIBUTIONS, BookSpec, OrderFlow, percentile
+
+# For these metrics a higher value is better; for the *_us latencies lower is better.
+THROUGHPUT_METRICS = ("orders_per_s", "fills_per_s", "calls_per_s")
+
+
+def _latency_summary(samples_ns: list[int]) -> dict[str, float]:
+    samples_us = [s / 1000 for s in samples_ns]
+    return {"p50_us": round(percentile(samples_us, 0.50), 3), "p99_us": round(percentile(samples_us, 0.99), 3)}
+
+
+def bench_book(spec: BookSpec, resting: int, incoming: int, fixed_point: bool) -> dict[str, float]:
+    flow = OrderFlow(spec)
+    book = OrderBook("BTCUSDT", scale_for("BTCUSDT") if fixed_point else None)
+    for order in flow.resting(resting):
+        book.add(order)
+    stream = flow.incoming(incoming)
+
+    gc.collect()
+    latencies: list[int] = []
+    fills = 0
+    clock = time.perf_counter_ns
+    started = clock()
+    for order in stream:
+        t0 = clock()
+        fills += len(book.submit(order))
+        latencies.append(clock() - t0)
+    elapsed = (clock() - started) / 1e9
+
+    return {"orders_per_s": round(incoming / elapsed), "fills_per_s": round(fills / elapsed), "fills": fills, **_latency_summary(latencies)}
+
+
+def bench_match_orders(spec: BookSpec, resting: int, repeats: int) -> dict[str, float]:
+    """The list-based match_orders, re-sorting both sides on every call."""
+    flow = OrderFlow(spec)
+    # A crossed batch: resting orders plus marketable ones, as the old admin sweep would see them.
+    orders = flow.resting(resting) + flow.incoming(max(1, resting // 10))
+    buys = [o for o in orders if o.side == "buy"]
+    sells = [o for o in orders if o.side == "sell"]
+
+    latencies: list[int] = []
+    fills = 0
+    for _ in range(repeats):
+        # match_orders mutates amounts, so each call gets fresh copies.
+        buy_copy = [replace(o) for o in buys]
+        sell_copy = [replace(o) for o in sells]
+        t0 = time.perf_counter_ns()
+        fills += len(match_orders(buy_copy, sell_copy))
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = sum(latencies) / 1e9
+
+    return {"calls_per_s": round(repeats / elapsed, 2), "fills_per_s": round(fills / elapsed), **_latency_summary(latencies)}
+
+
+def bench_settle(calls: int) -> dict[str, float]:
+    price, amount = Decimal("30000.01"), Decimal("0.123456")
+    started = time.perf_counter()
+    for _ in range(calls):
+        settle_trade(price, amount)
+    return {"calls_per_s": round(calls / (time.perf_counter() - started))}
+
+
+def bench_fee(calls: int) -> dict[str, float]:
+    amount = Decimal("3703.703703")
+    started = time.perf_counter()
+    for _ in range(calls):
+        calculate_trading_fee(amount)
+    return {"calls_per_s": round(calls / (time.perf_counter() - started))}
+
+
+def peak_memory(spec: BookSpec, resting: int, incoming: int, fixed_point: bool) -> int:
+    """Peak traced bytes for the book scenario, measured in its own pass so tracing does not skew timings."""
+    gc.collect()
+    tracemalloc.start()
+    bench_book(spec, resting, incoming, fixed_point)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def run(args: argparse.Namespace) -> dict:
+    spec = BookSpec(
+        depth=args.depth,
+        spread_ticks=args.spread_ticks,
+        size=args.size,
+        mean_size=args.mean_size,
+        crossing_ratio=args.crossing_ratio,
+        seed=args.seed,
+    )
+    results = {
+        "book_submit": bench_book(spec, args.resting, args.incoming, args.fixed_point),
+        "match_orders": bench_match_orders(spec, min(args.resting, args.batch_size), args.repeats),
+        "settle_trade": bench_settle(args.calls),
+        "calculate_trading_fee": bench_fee(args.calls),
+    }
+    if not args.skip_memory:
+        results["book_submit"]["peak_mb"] = round(peak_memory(spec, args.resting, args.incoming, args.fixed_point) / 2**20, 1)
+    spec_out = {k: str(v) if isinstance(v, Decimal) else v for k, v in asdict(spec).items()}
+    return {"spec": spec_out, "resting": args.resting, "incoming": args.incoming, "fixed_point": args.fixed_point, "results": results}
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for scenario, metrics in current["results"].items():
+        base_metrics = baseline["results"].get(scenario, {})
+        for name, value in metrics.items():
+            base = base_metrics.get(name)
+            if not base or name in ("fills", "peak_mb"):
+                continue
+            change = (value - base) / base
+            worse = change < -tolerance if name in THROUGHPUT_METRICS else change > tolerance
+            marker = "REGRESSION" if worse else ""
+            print(f"  {scenario:<22}{name:<14}{base:>14}{value:>14}{change:>+9.1%}  {marker}")
+            if worse:
+                regressions.append(f"{scenario}.{name}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=500, help="price levels per side")
+    parser.add_argument("--spread-ticks", type=int, default=1)
+    parser.add_argument("--size", choices=SIZE_DISTRIBUTIONS, default="lognormal", help="order size distribution")
+    parser.add_argument("--mean-size", type=float, default=0.5)
+    parser.add_argument("--crossing-ratio", type=float, default=0.2)
+    parser.add_argument("--resting", type=int, default=100_000, help="orders loaded before the stream")
+    parser.add_argument("--incoming", type=int, default=50_000, help="orders submitted to the book")
+    parser.add_argument("--batch-size", type=int, default=20_000, help="orders per match_orders call")
+    parser.add_argument("--repeats", type=int, default=20, help="match_orders calls")
+    parser.add_argument("--calls", type=int, default=200_000, help="settle_trade / fee calls")
+    parser.add_argument("--fixed-point", action="store_true")
+    parser.add_argument("--skip-memory", action="store_true", help="skip the traced peak-memory pass")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from --save to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown before failing")
+    args = parser.parse_args()
+
+    report = run(args)
+    for scenario, metrics in report["results"].items():
+        print(f"{scenario:<24}" + "  ".join(f"{k}={v}" for k, v in metrics.items()))
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        if any(baseline[k] != report[k] for k in ("spec", "resting", "incoming", "fixed_point")):
+            print("warning: baseline was recorded with different parameters", file=sys.stderr)
+        print(f"comparison against {args.compare} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(baseline, report, args.tolerance)
+        if regressions:
+            print(f"regressions: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Memory per resting order and match throughput for the in-memory order book.
+
+Run from backend/:
+
+    python -m benchmarks.bench_memory --orders 1000000
+    python -m benchmarks.bench_memory --orders 1000000 --fixed-point
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from decimal import Decimal
+
+from App.services.fixed_point import scale_for
+from App.services.order_book import OrderBook
+from App.services.trading_engine import SimpleOrder
+
+
+@dataclass
+class _UnslottedOrder:
+    """Same fields as SimpleOrder without slots, for the per-record comparison."""
+
+    id: int
+    user_id: int
+    side: str
+    price: Decimal
+    amount: Decimal
+    created_at_ts: float
+
+
+def _record_bytes(record) -> int:
+    size = sys.getsizeof(record)
+    if hasattr(record, "__dict__"):
+        size += sys.getsizeof(record.__dict__)
+    return size
+
+
+def _synthetic_orders(count: int, levels: int, seed: int) -> list[SimpleOrder]:
+    rng = random.Random(seed)
+    # Shared level prices, as a real book repeats the same few price objects across orders.
+    bids = [Decimal("30000.00") - Decimal("0.01") * i for i in range(levels)]
+    asks = [Decimal("30000.01") + Decimal("0.01") * i for i in range(levels)]
+    orders = []
+    for i in range(count):
+        side = "buy" if i % 2 else "sell"
+        price = rng.choice(bids if side == "buy" else asks)
+        amount = Decimal(rng.randint(1, 1_000_000)).scaleb(-6)
+        orders.append(SimpleOrder(id=i + 1, user_id=rng.randint(1, 50_000), side=side, price=price, amount=amount, created_at_ts=float(i)))
+    return orders
+
+
+def main(orders: int, levels: int, takers: int, fixed_point: bool, seed: int) -> None:
+    sample = SimpleOrder(id=1, user_id=1, side="buy", price=Decimal("1"), amount=Decimal("1"), created_at_ts=0.0)
+    unslotted = _UnslottedOrder(id=1, user_id=1, side="buy", price=Decimal("1"), amount=Decimal("1"), created_at_ts=0.0)
+    print(f"record bytes: slotted={_record_bytes(sample)} unslotted={_record_bytes(unslotted)}")
+
+    scale = scale_for("BTCUSDT") if fixed_point else None
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    resting = _synthetic_orders(orders, levels, seed)
+    started = time.perf_counter()
+    book = OrderBook("BTCUSDT", scale)
+    for order in resting:
+        book.add(order)
+    load_seconds = time.perf_counter() - started
+    # Whatever the book did not keep (input records in fixed-point mode, the list itself) is freed here.
+    del resting, order
+    gc.collect()
+    book_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"orders={len(book):,} levels/side={levels} fixed_point={fixed_point}")
+    print(f"book bytes/order: {book_bytes / max(len(book), 1):.1f}")
+    print(f"load: {orders / load_seconds:,.0f} orders/s")
+
+    rng = random.Random(seed + 1)
+    fills = 0
+    started = time.perf_counter()
+    for i in range(takers):
+        side = "buy" if i % 2 else "sell"
+        price = Decimal("30000.00") + (Decimal("0.01") * levels if side == "buy" else -Decimal("0.01") * levels)
+        taker = SimpleOrder(
+            id=orders + i + 1, user_id=0, side=side, price=price, amount=Decimal(rng.randint(1, 3_000_000)).scaleb(-6), created_at_ts=float(orders + i)
+        )
+        fills += len(book.submit(taker))
+    match_seconds = time.perf_counter() - started
+    print(f"match: {takers / match_seconds:,.0f} takers/s, {fills / match_seconds:,.0f} fills/s ({fills:,} fills)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--levels", type=int, default=500, help="price levels per side")
+    parser.add_argument("--takers", type=int, default=100_000, help="crossing orders submitted after loading")
+    parser.add_argument("--fixed-point", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.orders, args.levels, args.takers, args.fixed_point, args.seed)
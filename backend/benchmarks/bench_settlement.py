@@ -0,0 +1,125 @@
+"""Queries per fill for trade settlement: the old per-fill loop vs. batched settle_matches.
+
+Run from backend/:
+
+    python -m benchmarks.bench_settlement --fills 1000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from App.models import Balance, Base, Order, Transaction, User
+from App.services.settlement import settle_matches
+from App.services.trading_engine import MatchExecution, settle_trade
+
+
+async def _legacy_get_or_create_balance(db: AsyncSession, user_id: int, coin: str) -> Balance:
+    result = await db.execute(select(Balance).where(Balance.user_id == user_id, Balance.coin == coin))
+    bal = result.scalar_one_or_none()
+    if bal is None:
+        bal = Balance(user_id=user_id, coin=coin, amount=Decimal("0"))
+        db.add(bal)
+    return bal
+
+
+async def legacy_settle(db: AsyncSession, matches: list[MatchExecution], base_coin: str, quote_coin: str) -> int:
+    """The settlement loop as it was before batching: four balance lookups per fill."""
+    ids = {m.buy_order_id for m in matches} | {m.sell_order_id for m in matches}
+    result = await db.execute(select(Order).where(Order.id.in_(ids)))
+    by_id = {o.id: o for o in result.scalars().all()}
+    executed = 0
+    for m in matches:
+        buy_order = by_id[m.buy_order_id]
+        sell_order = by_id[m.sell_order_id]
+        buyer_quote = await _legacy_get_or_create_balance(db, buy_order.user_id, quote_coin)
+        buyer_base = await _legacy_get_or_create_balance(db, buy_order.user_id, base_coin)
+        seller_base = await _legacy_get_or_create_balance(db, sell_order.user_id, base_coin)
+        seller_quote = await _legacy_get_or_create_balance(db, sell_order.user_id, quote_coin)
+
+        settlement = settle_trade(price=m.price, amount=m.amount)
+        if buyer_quote.amount < -settlement.buyer_quote_delta or seller_base.amount < -settlement.seller_base_delta:
+            continue
+
+        buyer_quote.amount += settlement.buyer_quote_delta
+        buyer_base.amount += settlement.buyer_base_delta
+        seller_base.amount += settlement.seller_base_delta
+        seller_quote.amount += settlement.seller_quote_delta
+        buy_order.amount = Decimal(buy_order.amount) - m.amount
+        sell_order.amount = Decimal(sell_order.amount) - m.amount
+        buy_order.status = "filled" if buy_order.amount == 0 else "open"
+        sell_order.status = "filled" if sell_order.amount == 0 else "open"
+        db.add(Transaction(user_id=buy_order.user_id, coin=base_coin, amount=settlement.buyer_base_delta, type="trade_buy", status="completed"))
+        db.add(Transaction(user_id=sell_order.user_id, coin=quote_coin, amount=settlement.seller_quote_delta, type="trade_sell", status="completed"))
+        executed += 1
+    return executed
+
+
+async def _seed(session_local: async_sessionmaker, fills: int, users: int) -> list[MatchExecution]:
+    async with session_local() as db:
+        people = [User(email=f"bench{i}@example.com", hashed_password="x") for i in range(users)]
+        db.add_all(people)
+        await db.flush()
+        for position, user in enumerate(people):
+            db.add(Balance(user_id=user.id, coin="USDT", amount=Decimal("1000000")))
+            # Buyers (even positions) start without a BTC row so the create-missing path is exercised.
+            if position % 2:
+                db.add(Balance(user_id=user.id, coin="BTC", amount=Decimal("1000000")))
+
+        buys, sells = [], []
+        for i in range(fills):
+            buyer = people[(2 * i) % users]
+            seller = people[(2 * i + 1) % users]
+            buys.append(Order(user_id=buyer.id, side="buy", symbol="BTCUSDT", price=Decimal("100"), amount=Decimal("1")))
+            sells.append(Order(user_id=seller.id, side="sell", symbol="BTCUSDT", price=Decimal("100"), amount=Decimal("1")))
+        db.add_all([*buys, *sells])
+        await db.commit()
+        return [MatchExecution(buy_order_id=b.id, sell_order_id=s.id, price=Decimal("100"), amount=Decimal("1")) for b, s in zip(buys, sells)]
+
+
+async def _run(name: str, fills: int, users: int) -> tuple[int, int, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_local = async_sessionmaker(engine, expire_on_commit=False)
+        matches = await _seed(session_local, fills, users)
+
+        statements = 0
+
+        def count(*_args) -> None:
+            nonlocal statements
+            statements += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        started = time.perf_counter()
+        async with session_local() as db:
+            if name == "legacy":
+                executed = await legacy_settle(db, matches, "BTC", "USDT")
+            else:
+                executed = len((await settle_matches(db, matches, "BTC", "USDT")).executed)
+            await db.commit()
+        elapsed = time.perf_counter() - started
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+        await engine.dispose()
+    return executed, statements, elapsed
+
+
+async def main(fills: int, users: int) -> None:
+    print(f"{'variant':<10}{'fills':>8}{'statements':>12}{'per fill':>10}{'seconds':>10}")
+    for name in ("legacy", "batched"):
+        executed, statements, elapsed = await _run(name, fills, users)
+        print(f"{name:<10}{executed:>8}{statements:>12}{statements / max(executed, 1):>10.3f}{elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fills", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.fills, args.users))
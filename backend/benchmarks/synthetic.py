@@ -0,0 +1,95 @@
+"""Synthetic order flow shared by the engine benchmarks."""
+import math
+import random
+from dataclasses import dataclass
+from decimal import Decimal
+
+from App.services.trading_engine import SimpleOrder
+
+SIZE_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+LOT = Decimal("0.000001")
+
+
+@dataclass
+class BookSpec:
+    depth: int = 500  # price levels per side
+    spread_ticks: int = 1  # gap between best bid and best ask
+    tick: Decimal = Decimal("0.01")
+    mid: Decimal = Decimal("30000")
+    size: str = "lognormal"
+    mean_size: float = 0.5
+    crossing_ratio: float = 0.2  # share of incoming orders priced through the opposite best
+    seed: int = 7
+
+    def __post_init__(self):
+        if self.size not in SIZE_DISTRIBUTIONS:
+            raise ValueError(f"size must be one of {SIZE_DISTRIBUTIONS}")
+
+
+class OrderFlow:
+    """Deterministic generator of resting and incoming orders for a `BookSpec`."""
+
+    def __init__(self, spec: BookSpec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.next_id = 1
+        half_spread = spec.tick * spec.spread_ticks / 2
+        self.best_bid = (spec.mid - half_spread).quantize(spec.tick)
+        self.best_ask = self.best_bid + spec.tick * spec.spread_ticks
+        # Level prices are shared objects, as in a real book.
+        self.bid_levels = [self.best_bid - spec.tick * i for i in range(spec.depth)]
+        self.ask_levels = [self.best_ask + spec.tick * i for i in range(spec.depth)]
+
+    def _amount(self) -> Decimal:
+        spec = self.spec
+        if spec.size == "fixed":
+            lots = spec.mean_size
+        elif spec.size == "uniform":
+            lots = self.rng.uniform(0, 2 * spec.mean_size)
+        else:
+            sigma = 1.0
+            lots = self.rng.lognormvariate(math.log(spec.mean_size) - sigma**2 / 2, sigma)
+        return max(LOT, Decimal(str(lots)).quantize(LOT))
+
+    def _order(self, side: str, price: Decimal) -> SimpleOrder:
+        order = SimpleOrder(
+            id=self.next_id,
+            user_id=self.rng.randint(1, 50_000),
+            side=side,
+            price=price,
+            amount=self._amount(),
+            created_at_ts=float(self.next_id),
+        )
+        self.next_id += 1
+        return order
+
+    def resting(self, count: int) -> list[SimpleOrder]:
+        """Non-crossing orders spread across `depth` levels on each side."""
+        orders = []
+        for i in range(count):
+            side = "buy" if i % 2 else "sell"
+            levels = self.bid_levels if side == "buy" else self.ask_levels
+            orders.append(self._order(side, self.rng.choice(levels)))
+        return orders
+
+    def incoming(self, count: int) -> list[SimpleOrder]:
+        """Orders arriving after the book is loaded; `crossing_ratio` of them are marketable."""
+        orders = []
+        for _ in range(count):
+            side = self.rng.choice(("buy", "sell"))
+            if self.rng.random() < self.spec.crossing_ratio:
+                # Priced a few levels through the opposite best, so it may walk several levels.
+                through = self.rng.randint(0, 4)
+                price = self.best_ask + self.spec.tick * through if side == "buy" else self.best_bid - self.spec.tick * through
+            else:
+                levels = self.bid_levels if side == "buy" else self.ask_levels
+                price = self.rng.choice(levels)
+            orders.append(self._order(side, price))
+        return orders
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
@@ -21,8 +21,10 @@ config.set_main_option("sqlalchemy.url", sync_db_url)
 
 from App.models import Base  # noqa: E402
 from App.models.balance import Balance  # noqa: F401,E402
+from App.models.candle import Candle  # noqa: F401,E402
 from App.models.order import Order  # noqa: F401,E402
 from App.models.queue import WithdrawalQueue  # noqa: F401,E402
+from App.models.trade import Trade  # noqa: F401,E402
 from App.models.transaction import Transaction  # noqa: F401,E402
 from App.models.user import User  # noqa: F401,E402
 from App.models.wallet import Wallet  # noqa: F401,E402
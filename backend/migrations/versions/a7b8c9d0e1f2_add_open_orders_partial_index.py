@@ -0,0 +1,41 @@
+"""add partial index on open orders
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a7b8c9d0e1f2"
+down_revision: Union[str, Sequence[str], None] = "f6a7b8c9d0e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return any(idx["name"] == index_name for idx in inspector.get_indexes(table_name))
+
+
+def upgrade() -> None:
+    # Only open orders are indexed, so the index stays small while filled and cancelled history grows.
+    if not _index_exists("orders", "ix_orders_open_symbol_created_at"):
+        op.create_index(
+            "ix_orders_open_symbol_created_at",
+            "orders",
+            ["symbol", "created_at", "id"],
+            unique=False,
+            postgresql_where=sa.text("status = 'open'"),
+            sqlite_where=sa.text("status = 'open'"),
+        )
+
+
+def downgrade() -> None:
+    if _index_exists("orders", "ix_orders_open_symbol_created_at"):
+        op.drop_index("ix_orders_open_symbol_created_at", table_name="orders")
@@ -0,0 +1,87 @@
+"""link withdrawal_queue rows to their ledger transaction
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "b8c9d0e1f2a3"
+down_revision: Union[str, Sequence[str], None] = "a7b8c9d0e1f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return any(col["name"] == column_name for col in inspector.get_columns(table_name))
+
+
+withdrawal_queue = sa.table(
+    "withdrawal_queue",
+    sa.column("id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("coin", sa.String),
+    sa.column("amount", sa.Numeric(36, 18)),
+    sa.column("created_at", sa.DateTime),
+    sa.column("transaction_id", sa.Integer),
+)
+transactions = sa.table(
+    "transactions",
+    sa.column("id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("coin", sa.String),
+    sa.column("amount", sa.Numeric(36, 18)),
+    sa.column("type", sa.String),
+    sa.column("created_at", sa.DateTime),
+)
+
+
+def _backfill() -> None:
+    # request_withdrawal is the only writer of withdrawal transactions and always wrote one per
+    # queue row in the same commit, so the n-th request for a (user, coin, amount) pairs with the
+    # n-th withdrawal transaction for it.
+    bind = op.get_bind()
+    candidates: dict[tuple, list[int]] = defaultdict(list)
+    tx_rows = bind.execute(
+        sa.select(transactions.c.id, transactions.c.user_id, transactions.c.coin, transactions.c.amount)
+        .where(transactions.c.type == "withdrawal")
+        .order_by(transactions.c.created_at, transactions.c.id)
+    )
+    for row in tx_rows:
+        candidates[(row.user_id, row.coin, Decimal(row.amount))].append(row.id)
+
+    queue_rows = bind.execute(
+        sa.select(withdrawal_queue.c.id, withdrawal_queue.c.user_id, withdrawal_queue.c.coin, withdrawal_queue.c.amount)
+        .where(withdrawal_queue.c.transaction_id.is_(None))
+        .order_by(withdrawal_queue.c.created_at, withdrawal_queue.c.id)
+    ).all()
+    for row in queue_rows:
+        matches = candidates.get((row.user_id, row.coin, Decimal(row.amount)))
+        if matches:
+            bind.execute(withdrawal_queue.update().where(withdrawal_queue.c.id == row.id).values(transaction_id=matches.pop(0)))
+
+
+def upgrade() -> None:
+    if not _column_exists("withdrawal_queue", "transaction_id"):
+        with op.batch_alter_table("withdrawal_queue", schema=None) as batch_op:
+            batch_op.add_column(sa.Column("transaction_id", sa.Integer(), nullable=True))
+            batch_op.create_foreign_key("fk_withdrawal_queue_transaction_id", "transactions", ["transaction_id"], ["id"])
+            batch_op.create_index("ix_withdrawal_queue_transaction_id", ["transaction_id"], unique=True)
+    _backfill()
+
+
+def downgrade() -> None:
+    if _column_exists("withdrawal_queue", "transaction_id"):
+        # Dropping the column drops its foreign key with it.
+        with op.batch_alter_table("withdrawal_queue", schema=None) as batch_op:
+            batch_op.drop_index("ix_withdrawal_queue_transaction_id")
+            batch_op.drop_column("transaction_id")
@@ -0,0 +1,34 @@
+"""add (created_at, id) index on transactions
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c9d0e1f2a3b4"
+down_revision: Union[str, Sequence[str], None] = "b8c9d0e1f2a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return any(idx["name"] == index_name for idx in inspector.get_indexes(table_name))
+
+
+def upgrade() -> None:
+    # Admin ledger pages are (created_at, id) < cursor range scans on this index.
+    if not _index_exists("transactions", "ix_transactions_created_at_id"):
+        op.create_index("ix_transactions_created_at_id", "transactions", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    if _index_exists("transactions", "ix_transactions_created_at_id"):
+        op.drop_index("ix_transactions_created_at_id", table_name="transactions")
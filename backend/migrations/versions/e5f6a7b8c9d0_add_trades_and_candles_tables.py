@@ -0,0 +1,80 @@
+"""add trades and candles tables
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e5f6a7b8c9d0"
+down_revision: Union[str, Sequence[str], None] = "d4e5f6a7b8c9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade() -> None:
+    if not _table_exists("trades"):
+        op.create_table(
+            "trades",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("symbol", sa.String(length=20), nullable=False),
+            sa.Column("price", sa.Numeric(precision=36, scale=18), nullable=False),
+            sa.Column("amount", sa.Numeric(precision=36, scale=18), nullable=False),
+            sa.Column("buy_order_id", sa.Integer(), nullable=False),
+            sa.Column("sell_order_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.ForeignKeyConstraint(["buy_order_id"], ["orders.id"]),
+            sa.ForeignKeyConstraint(["sell_order_id"], ["orders.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(op.f("ix_trades_id"), "trades", ["id"], unique=False)
+        op.create_index(op.f("ix_trades_buy_order_id"), "trades", ["buy_order_id"], unique=False)
+        op.create_index(op.f("ix_trades_sell_order_id"), "trades", ["sell_order_id"], unique=False)
+        op.create_index("ix_trades_symbol_created_at", "trades", ["symbol", "created_at"], unique=False)
+
+    if not _table_exists("candles"):
+        op.create_table(
+            "candles",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("symbol", sa.String(length=20), nullable=False),
+            sa.Column("interval", sa.String(length=8), nullable=False),
+            sa.Column("open_time", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("open", sa.Numeric(precision=36, scale=18), nullable=False),
+            sa.Column("high", sa.Numeric(precision=36, scale=18), nullable=False),
+            sa.Column("low", sa.Numeric(precision=36, scale=18), nullable=False),
+            sa.Column("close", sa.Numeric(precision=36, scale=18), nullable=False),
+            sa.Column("volume", sa.Numeric(precision=36, scale=18), nullable=False),
+            sa.Column("quote_volume", sa.Numeric(precision=36, scale=18), nullable=False),
+            sa.Column("trades", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("symbol", "interval", "open_time", name="uq_candles_symbol_interval_open_time"),
+        )
+        op.create_index(op.f("ix_candles_id"), "candles", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    if _table_exists("candles"):
+        try:
+            op.drop_index(op.f("ix_candles_id"), table_name="candles")
+        except Exception:
+            pass
+        op.drop_table("candles")
+
+    if _table_exists("trades"):
+        for idx in ["ix_trades_symbol_created_at", op.f("ix_trades_sell_order_id"), op.f("ix_trades_buy_order_id"), op.f("ix_trades_id")]:
+            try:
+                op.drop_index(idx, table_name="trades")
+            except Exception:
+                pass
+        op.drop_table("trades")
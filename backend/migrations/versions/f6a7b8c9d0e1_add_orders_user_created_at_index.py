@@ -0,0 +1,34 @@
+"""add (user_id, created_at) index on orders
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "f6a7b8c9d0e1"
+down_revision: Union[str, Sequence[str], None] = "e5f6a7b8c9d0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return any(idx["name"] == index_name for idx in inspector.get_indexes(table_name))
+
+
+def upgrade() -> None:
+    # Order history pages are (user_id =, created_at <) range scans on this index.
+    if not _index_exists("orders", "ix_orders_user_id_created_at"):
+        op.create_index("ix_orders_user_id_created_at", "orders", ["user_id", "created_at"], unique=False)
+
+
+def downgrade() -> None:
+    if _index_exists("orders", "ix_orders_user_id_created_at"):
+        op.drop_index("ix_orders_user_id_created_at", table_name="orders")
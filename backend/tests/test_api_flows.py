@@ -1,4 +1,10 @@
+import asyncio
+import csv
+import io
+import json
 import os
+import time
+from decimal import Decimal
 from pathlib import Path
 import importlib.util
 
@@ -7,6 +13,7 @@ import pytest
 if importlib.util.find_spec("aiosqlite") is None:
     pytest.skip("aiosqlite is required for API integration flow tests", allow_module_level=True)
 
+import httpx
 from fastapi.testclient import TestClient
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
@@ -14,10 +21,19 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 # Ensure App.database can import during test startup.
 os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./test_bootstrap.db")
 
+from App.core.config import settings
+from App.core.security import pwd_context
 from App.database import get_db
-from App.main import app
+from App.main import app, limiter
 from App.models import Base
+from App.models.order import Order
 from App.models.user import Role, User
+from App.services.book_feed import book_feed
+from App.services.candles import candle_aggregator
+from App.services.order_book import OrderBook, order_books
+from App.services.price_fetcher import PriceSnapshot, price_fetcher
+from App.services.ticker import ticker_index
+from App.services.user_cache import user_cache
 
 
 @pytest.fixture()
@@ -46,6 +62,12 @@ def client() -> TestClient:
 
     asyncio.run(prepare_db())
     app.dependency_overrides[get_db] = override_get_db
+    order_books.clear()
+    book_feed.clear()
+    candle_aggregator.clear()
+    ticker_index.clear()
+    limiter.clear()
+    user_cache.clear()
 
     with TestClient(app) as test_client:
         yield test_client
@@ -87,6 +109,7 @@ def _promote_user_to_admin(email: str) -> None:
             user = result.scalar_one()
             user.role = Role.ADMIN
             await session.commit()
+        user_cache.invalidate(email)
 
     import asyncio
 
@@ -151,16 +174,29 @@ def test_wallet_trade_and_admin_withdrawal_flow(client: TestClient):
     )
     assert buy_order.status_code == 200, buy_order.text
 
+    book = client.get("/api/v1/trades/orderbook/BTCUSDT", params={"depth": 10})
+    assert book.status_code == 200, book.text
+    bids = book.json()["bids"]
+    assert [(Decimal(b["price"]), Decimal(b["amount"]), b["orders"]) for b in bids] == [(Decimal("100"), Decimal("0.5"), 1)]
+
     sell_order = client.post(
         "/api/v1/trades/",
         json={"side": "sell", "symbol": "BTCUSDT", "price": "99", "amount": "0.5"},
         headers=_auth_headers(seller_token),
     )
     assert sell_order.status_code == 200, sell_order.text
+    sell_body = sell_order.json()
+    assert sell_body["status"] == "filled"
+    assert len(sell_body["fills"]) == 1
+    assert sell_body["fills"][0]["counter_order_id"] == buy_order.json()["order_id"]
+    assert sell_body["fills"][0]["price"].startswith("100")
 
     match = client.post("/api/v1/trades/match/BTCUSDT", headers=_auth_headers(admin_token))
     assert match.status_code == 200, match.text
-    assert match.json()["matches"] >= 1
+    assert match.json()["matches"] == 0
+
+    balances = client.get("/api/v1/wallet/balances", headers=_auth_headers(seller_token)).json()
+    assert {b["coin"]: b["amount"] for b in balances}["USDT"].startswith("49.95")
 
     withdraw_req = client.post(
         "/api/v1/wallet/withdraw/request",
@@ -189,3 +225,449 @@ def test_wallet_trade_and_admin_withdrawal_flow(client: TestClient):
     admin_users = client.get("/api/v1/users/", headers=_auth_headers(admin_token))
     assert admin_users.status_code == 200
     assert len(admin_users.json()) >= 3
+
+
+def test_orderbook_feed_sends_snapshot_then_sequenced_diffs(client: TestClient):
+    _register(client, "maker@example.com", "MakerPass1", "maker")
+    token = _login_token(client, "maker@example.com", "MakerPass1")
+
+    def place(side: str, price: str, amount: str) -> None:
+        resp = client.post(
+            "/api/v1/trades/",
+            json={"side": side, "symbol": "BTCUSDT", "price": price, "amount": amount},
+            headers=_auth_headers(token),
+        )
+        assert resp.status_code == 200, resp.text
+
+    place("buy", "100", "1")
+
+    with client.websocket_connect("/api/v1/monitor/orderbook/BTCUSDT") as ws:
+        snapshot = ws.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert [(Decimal(b["price"]), b["orders"]) for b in snapshot["bids"]] == [(Decimal("100"), 1)]
+
+        place("buy", "100", "0.5")
+        place("sell", "105", "2")
+        first = ws.receive_json()
+        second = ws.receive_json()
+        assert (first["prev_seq"], second["prev_seq"]) == (snapshot["seq"], first["seq"])
+        assert [(Decimal(b["amount"]), b["orders"]) for b in first["bids"]] == [(Decimal("1.5"), 2)]
+        assert first["asks"] == []
+        assert [(Decimal(a["price"]), Decimal(a["amount"])) for a in second["asks"]] == [(Decimal("105"), Decimal("2"))]
+
+        ws.send_text("resync")
+        again = ws.receive_json()
+        assert again["type"] == "snapshot" and again["seq"] == second["seq"]
+        assert len(again["asks"]) == 1
+
+
+def test_live_transactions_receives_deposit_events(client: TestClient):
+    _register(client, "depositor@example.com", "DepositPass1", "depositor")
+    token = _login_token(client, "depositor@example.com", "DepositPass1")
+
+    with client.websocket_connect("/api/v1/monitor/live_transactions") as ws:
+        ws.send_text("ping")
+        assert ws.receive_text() == "pong"
+
+        resp = client.post("/api/v1/wallet/deposit", json={"coin": "USDT", "amount": "25"}, headers=_auth_headers(token))
+        assert resp.status_code == 200, resp.text
+        event = ws.receive_json()
+        assert (event["type"], event["kind"], event["coin"], event["amount"]) == ("transaction", "deposit", "USDT", "25")
+
+
+def test_order_placement_rejects_unknown_symbols_and_reloads_a_failed_book(client: TestClient, monkeypatch):
+    _register(client, "placer@example.com", "PlacerPass1", "placer")
+    headers = _auth_headers(_login_token(client, "placer@example.com", "PlacerPass1"))
+
+    unknown = client.post("/api/v1/trades/", json={"side": "buy", "symbol": "ZZ1USDT", "price": "1", "amount": "1"}, headers=headers)
+    assert unknown.status_code == 404
+    assert order_books.peek("ZZ1USDT") is None
+
+    def broken_submit(self, order):
+        raise RuntimeError("engine failure")
+
+    monkeypatch.setattr(OrderBook, "submit", broken_submit)
+    with pytest.raises(RuntimeError):
+        client.post("/api/v1/trades/", json={"side": "buy", "symbol": "BTCUSDT", "price": "100", "amount": "1"}, headers=headers)
+    assert order_books.peek("BTCUSDT") is None
+
+    # The committed order is back in the book once it is reloaded.
+    monkeypatch.undo()
+    book = client.get("/api/v1/trades/orderbook/BTCUSDT").json()
+    assert [(Decimal(level["price"]), level["orders"]) for level in book["bids"]] == [(Decimal("100"), 1)]
+
+
+def test_fixed_point_matching_through_the_api(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "MATCHING_FIXED_POINT", True)
+    _register(client, "ticks@example.com", "TicksPass1", "ticks")
+    headers = _auth_headers(_login_token(client, "ticks@example.com", "TicksPass1"))
+    client.post("/api/v1/wallet/deposit", json={"coin": "BTC", "amount": "1"}, headers=headers)
+    client.post("/api/v1/wallet/deposit", json={"coin": "USDT", "amount": "1000"}, headers=headers)
+
+    def place(side: str, price: str, amount: str):
+        return client.post("/api/v1/trades/", json={"side": side, "symbol": "BTCUSDT", "price": price, "amount": amount}, headers=headers)
+
+    assert place("buy", "100.015", "0.1").status_code == 400
+    assert place("sell", "100.01", "0.3").status_code == 200
+    taken = place("buy", "100.01", "0.5")
+    assert taken.status_code == 200, taken.text
+    assert taken.json()["status"] == "open"
+    assert Decimal(taken.json()["remaining"]) == Decimal("0.2")
+    assert [(Decimal(f["price"]), Decimal(f["amount"])) for f in taken.json()["fills"]] == [(Decimal("100.01"), Decimal("0.3"))]
+
+    # The stored rows reload into a scaled book rather than falling back to Decimal.
+    order_books.clear()
+    book = client.get("/api/v1/trades/orderbook/BTCUSDT").json()
+    assert order_books.peek("BTCUSDT").scale is not None
+    assert [(Decimal(level["price"]), Decimal(level["amount"])) for level in book["bids"]] == [(Decimal("100.01"), Decimal("0.2"))]
+    assert book["asks"] == []
+
+
+def test_settlement_trusts_the_stored_remainder_over_the_book(client: TestClient):
+    _register(client, "stale@example.com", "StalePass1", "stale")
+    headers = _auth_headers(_login_token(client, "stale@example.com", "StalePass1"))
+    client.post("/api/v1/wallet/deposit", json={"coin": "BTC", "amount": "1"}, headers=headers)
+    client.post("/api/v1/wallet/deposit", json={"coin": "USDT", "amount": "1000"}, headers=headers)
+    maker = client.post("/api/v1/trades/", json={"side": "sell", "symbol": "BTCUSDT", "price": "100", "amount": "1"}, headers=headers).json()
+
+    # Another writer fills most of the maker behind this worker's book.
+    async def shrink():
+        async for session in app.dependency_overrides[get_db]():
+            order = await session.get(Order, maker["order_id"])
+            order.amount = Decimal("0.25")
+            await session.commit()
+
+    asyncio.run(shrink())
+    taken = client.post("/api/v1/trades/", json={"side": "buy", "symbol": "BTCUSDT", "price": "100", "amount": "1"}, headers=headers).json()
+
+    # The full-size fill is skipped, the maker re-synced from its row, and only what it still holds trades.
+    assert [Decimal(f["amount"]) for f in taken["fills"]] == [Decimal("0.25")]
+    statuses = {o["id"]: (o["status"], Decimal(o["amount"])) for o in client.get("/api/v1/trades/", headers=headers).json()}
+    assert statuses[maker["order_id"]] == ("filled", Decimal("0"))
+    assert statuses[taken["order_id"]] == ("open", Decimal("0.75"))
+    book = client.get("/api/v1/trades/orderbook/BTCUSDT").json()
+    assert book["asks"] == []
+    assert [Decimal(level["amount"]) for level in book["bids"]] == [Decimal("0.75")]
+
+
+def test_unfunded_maker_is_cancelled_instead_of_crossing_the_book(client: TestClient):
+    tokens = {}
+    for name in ("ghost", "seller", "buyer"):
+        _register(client, f"{name}@example.com", "TradePass1", name)
+        tokens[name] = _auth_headers(_login_token(client, f"{name}@example.com", "TradePass1"))
+    client.post("/api/v1/wallet/deposit", json={"coin": "BTC", "amount": "1"}, headers=tokens["seller"])
+    client.post("/api/v1/wallet/deposit", json={"coin": "USDT", "amount": "1000"}, headers=tokens["buyer"])
+
+    def place(name: str, side: str, price: str) -> dict:
+        resp = client.post("/api/v1/trades/", json={"side": side, "symbol": "BTCUSDT", "price": price, "amount": "1"}, headers=tokens[name])
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    ghost = place("ghost", "sell", "100")
+    funded = place("seller", "sell", "100.5")
+    taken = place("buyer", "buy", "101")
+
+    # The ghost's ask came first but it holds no BTC: it is cancelled and the buy fills against the funded ask.
+    assert taken["status"] == "filled"
+    assert [(Decimal(f["price"]), Decimal(f["amount"]), f["counter_order_id"]) for f in taken["fills"]] == [
+        (Decimal("100.5"), Decimal("1"), funded["order_id"])
+    ]
+    statuses = {o["id"]: o["status"] for o in client.get("/api/v1/trades/", headers=tokens["ghost"]).json()}
+    assert statuses[ghost["order_id"]] == "cancelled"
+    book = client.get("/api/v1/trades/orderbook/BTCUSDT").json()
+    assert (book["bids"], book["asks"]) == ([], [])
+
+
+def test_candles_roll_up_fills_without_rescanning(client: TestClient):
+    _register(client, "trader@example.com", "TraderPass1", "trader")
+    token = _login_token(client, "trader@example.com", "TraderPass1")
+    for coin, amount in (("USDT", "10000"), ("BTC", "10")):
+        resp = client.post("/api/v1/wallet/deposit", json={"coin": coin, "amount": amount}, headers=_auth_headers(token))
+        assert resp.status_code == 200, resp.text
+
+    def trade(price: str, amount: str) -> None:
+        for side in ("buy", "sell"):
+            resp = client.post(
+                "/api/v1/trades/",
+                json={"side": side, "symbol": "BTCUSDT", "price": price, "amount": amount},
+                headers=_auth_headers(token),
+            )
+            assert resp.status_code == 200, resp.text
+
+    trade("100", "1")
+    # The 1m series is loaded from the rollup table here; the 1h series only after the second fill.
+    first = client.get("/api/v1/trades/candles/BTCUSDT", params={"interval": "1m"})
+    assert first.status_code == 200, first.text
+    assert first.json()["candles"][-1]["trades"] == 1
+
+    trade("110", "0.5")
+    for interval in ("1m", "1h"):
+        candles = client.get("/api/v1/trades/candles/BTCUSDT", params={"interval": interval}).json()["candles"]
+        # Both fills normally share a bucket; a minute boundary between them splits the 1m series.
+        total = sum(c["trades"] for c in candles)
+        assert total == 2
+        last = candles[-1]
+        assert Decimal(last["close"]) == Decimal("110")
+        if last["trades"] == 2:
+            assert (Decimal(last["open"]), Decimal(last["high"]), Decimal(last["low"])) == (Decimal("100"), Decimal("110"), Decimal("100"))
+            assert Decimal(last["volume"]) == Decimal("1.5")
+            assert Decimal(last["quote_volume"]) == Decimal("155")
+
+    bad = client.get("/api/v1/trades/candles/BTCUSDT", params={"interval": "3m"})
+    assert bad.status_code == 400
+
+
+def test_ticker_tracks_quotes_and_last_trade(client: TestClient):
+    _register(client, "quoter@example.com", "QuoterPass1", "quoter")
+    token = _login_token(client, "quoter@example.com", "QuoterPass1")
+    for coin, amount in (("USDT", "10000"), ("BTC", "10")):
+        client.post("/api/v1/wallet/deposit", json={"coin": coin, "amount": amount}, headers=_auth_headers(token))
+
+    def place(side: str, price: str, amount: str) -> None:
+        resp = client.post(
+            "/api/v1/trades/",
+            json={"side": side, "symbol": "BTCUSDT", "price": price, "amount": amount},
+            headers=_auth_headers(token),
+        )
+        assert resp.status_code == 200, resp.text
+
+    empty = client.get("/api/v1/prices/ticker/BTCUSDT").json()
+    assert (empty["best_bid"], empty["best_ask"], empty["last_price"]) == (None, None, None)
+
+    place("buy", "100", "1")
+    place("sell", "105", "1")
+    quoted = client.get("/api/v1/prices/ticker/BTCUSDT").json()
+    assert (Decimal(quoted["best_bid"]), Decimal(quoted["best_ask"]), Decimal(quoted["mid"])) == (Decimal("100"), Decimal("105"), Decimal("102.5"))
+
+    place("sell", "100", "0.4")
+    traded = client.get("/api/v1/prices/ticker/BTCUSDT").json()
+    assert Decimal(traded["last_price"]) == Decimal("100")
+    assert traded["last_trade_at"] is not None
+
+    # A restarted process picks the last trade back up from the trade tape.
+    ticker_index.clear()
+    order_books.clear()
+    tickers = {t["symbol"]: t for t in client.get("/api/v1/prices/ticker").json()}
+    assert Decimal(tickers["BTCUSDT"]["last_price"]) == Decimal("100")
+    assert Decimal(tickers["BTCUSDT"]["best_bid"]) == Decimal("100")
+    assert client.get("/api/v1/prices/ticker/DOGEUSDT").status_code == 404
+
+
+def test_prices_serve_internal_prices_without_waiting_on_upstream(client: TestClient, monkeypatch):
+    _register(client, "quoter@example.com", "QuoterPass1", "quoter")
+    headers = _auth_headers(_login_token(client, "quoter@example.com", "QuoterPass1"))
+    client.post("/api/v1/wallet/deposit", json={"coin": "USDT", "amount": "1000"}, headers=headers)
+    client.post("/api/v1/wallet/deposit", json={"coin": "BTC", "amount": "1"}, headers=headers)
+    client.post("/api/v1/trades/", json={"side": "buy", "symbol": "BTCUSDT", "price": "100", "amount": "1"}, headers=headers)
+    client.post("/api/v1/trades/", json={"side": "sell", "symbol": "BTCUSDT", "price": "105", "amount": "1"}, headers=headers)
+
+    async def unanswered(request: httpx.Request) -> httpx.Response:
+        await asyncio.Event().wait()
+
+    # Cold start with an upstream that never answers: our own prices come back at once.
+    monkeypatch.setattr(price_fetcher, "transport", httpx.MockTransport(unanswered))
+    monkeypatch.setattr(price_fetcher, "snapshot", None)
+    cold = client.get("/api/v1/prices/")
+    assert cold.status_code == 200
+    assert cold.headers["X-Prices-Source"] == "internal"
+    assert cold.json() == {"BTC": 102.5}
+
+    # Upstream quotes win in the body; our own price stays available on the ticker.
+    price_fetcher.snapshot = PriceSnapshot(prices={"BTC": 30000.0, "ETH": None, "SOL": 150.0}, fetched_at=time.time())
+    warm = client.get("/api/v1/prices/").json()
+    assert (warm["BTC"], warm["ETH"], warm["SOL"]) == (30000.0, None, 150.0)
+    assert Decimal(client.get("/api/v1/prices/ticker/BTCUSDT").json()["reference_price"]) == Decimal("102.5")
+
+    # /prices/ reads the trade tape only; it never warms a book outside the symbol's lane.
+    order_books.clear()
+    ticker_index.clear()
+    assert client.get("/api/v1/prices/").status_code == 200
+    assert order_books.peek("BTCUSDT") is None
+
+
+def test_admin_transactions_keyset_pages_and_streams(client: TestClient):
+    _register(client, "auditor@example.com", "AuditorPass1", "auditor")
+    _register(client, "saver@example.com", "SaverPass1", "saver")
+    _promote_user_to_admin("auditor@example.com")
+    admin_token = _login_token(client, "auditor@example.com", "AuditorPass1")
+    saver_token = _login_token(client, "saver@example.com", "SaverPass1")
+    for n in range(5):
+        coin = "BTC" if n % 2 else "USDT"
+        resp = client.post("/api/v1/wallet/deposit", json={"coin": coin, "amount": str(n + 1)}, headers=_auth_headers(saver_token))
+        assert resp.status_code == 200, resp.text
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/api/v1/admin/transactions", params=params, headers=_auth_headers(admin_token))
+        assert resp.status_code == 200, resp.text
+        seen.extend(tx["id"] for tx in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert len(seen) == 5 and seen == sorted(seen, reverse=True)
+
+    filtered = client.get("/api/v1/admin/transactions", params={"coin": "btc"}, headers=_auth_headers(admin_token)).json()
+    assert [tx["amount"][:1] for tx in filtered] == ["4", "2"]
+
+    ndjson = client.get("/api/v1/admin/transactions", params={"format": "ndjson", "coin": "USDT"}, headers=_auth_headers(admin_token))
+    assert ndjson.status_code == 200
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [tx["coin"] for tx in lines] == ["USDT"] * 3
+
+    exported = client.get("/api/v1/admin/transactions", params={"format": "csv"}, headers=_auth_headers(admin_token))
+    rows = list(csv.DictReader(io.StringIO(exported.text)))
+    assert [int(r["id"]) for r in rows] == seen
+
+    assert client.get("/api/v1/admin/transactions", params={"cursor": "not-a-cursor"}, headers=_auth_headers(admin_token)).status_code == 400
+
+
+def test_order_history_is_paginated_and_filtered(client: TestClient):
+    _register(client, "maker2@example.com", "MakerPass2", "maker2")
+    token = _login_token(client, "maker2@example.com", "MakerPass2")
+    for n in range(5):
+        side = "buy" if n % 2 else "sell"
+        price = "90" if side == "buy" else "120"
+        resp = client.post(
+            "/api/v1/trades/",
+            json={"side": side, "symbol": "ETHUSDT" if n == 4 else "BTCUSDT", "price": price, "amount": "1"},
+            headers=_auth_headers(token),
+        )
+        assert resp.status_code == 200, resp.text
+    cancelled = client.delete(f"/api/v1/trades/{resp.json()['order_id']}", headers=_auth_headers(token))
+    assert cancelled.status_code == 200, cancelled.text
+
+    first = client.get("/api/v1/trades/", params={"limit": 3}, headers=_auth_headers(token))
+    assert len(first.json()) == 3
+    rest = client.get("/api/v1/trades/", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]}, headers=_auth_headers(token))
+    assert len(rest.json()) == 2 and "X-Next-Cursor" not in rest.headers
+    ids = [o["id"] for o in first.json() + rest.json()]
+    assert ids == sorted(ids, reverse=True)
+
+    def count(**params) -> int:
+        return len(client.get("/api/v1/trades/", params=params, headers=_auth_headers(token)).json())
+
+    assert count(side="buy") == 2
+    assert count(symbol="BTC/USDT") == 4
+    assert count(status="cancelled") == 1
+    assert client.get("/api/v1/trades/", params={"status": "bogus"}, headers=_auth_headers(token)).status_code == 422
+
+
+def test_withdrawal_review_updates_its_own_ledger_row(client: TestClient):
+    _register(client, "admin@example.com", "AdminPass1", "admin")
+    _register(client, "holder@example.com", "HolderPass1", "holder")
+    _promote_user_to_admin("admin@example.com")
+    admin_token = _login_token(client, "admin@example.com", "AdminPass1")
+    token = _login_token(client, "holder@example.com", "HolderPass1")
+
+    client.post("/api/v1/wallet/deposit", json={"coin": "BTC", "amount": "1"}, headers=_auth_headers(token))
+    # Two requests that are identical by user, coin and amount.
+    requests = [
+        client.post(
+            "/api/v1/wallet/withdraw/request",
+            json={"coin": "BTC", "amount": "0.25", "destination_address": "bc1qexample"},
+            headers=_auth_headers(token),
+        ).json()
+        for _ in range(2)
+    ]
+    first, second = requests
+    assert first["transaction_id"] != second["transaction_id"]
+
+    assert client.post(f"/api/v1/admin/withdrawals/{first['id']}/reject", json={}, headers=_auth_headers(admin_token)).status_code == 200
+    assert client.post(f"/api/v1/admin/withdrawals/{second['id']}/approve", json={}, headers=_auth_headers(admin_token)).status_code == 200
+
+    ledger = client.get("/api/v1/admin/transactions", params={"type": "withdrawal"}, headers=_auth_headers(admin_token)).json()
+    statuses = {tx["id"]: tx["status"] for tx in ledger}
+    assert statuses == {first["transaction_id"]: "rejected", second["transaction_id"]: "approved"}
+
+
+def test_batch_withdrawal_review_reports_each_item(client: TestClient):
+    _register(client, "admin@example.com", "AdminPass1", "admin")
+    _register(client, "holder@example.com", "HolderPass1", "holder")
+    _promote_user_to_admin("admin@example.com")
+    admin_headers = _auth_headers(_login_token(client, "admin@example.com", "AdminPass1"))
+    headers = _auth_headers(_login_token(client, "holder@example.com", "HolderPass1"))
+
+    client.post("/api/v1/wallet/deposit", json={"coin": "BTC", "amount": "1"}, headers=headers)
+    ids = [
+        client.post(
+            "/api/v1/wallet/withdraw/request",
+            json={"coin": "BTC", "amount": "0.1", "destination_address": f"bc1q{n}"},
+            headers=headers,
+        ).json()["id"]
+        for n in range(4)
+    ]
+
+    rejected = client.post("/api/v1/admin/withdrawals/batch/reject", json={"ids": ids[:2], "note": "bad address"}, headers=admin_headers)
+    assert rejected.status_code == 200, rejected.text
+    assert [r["status"] for r in rejected.json()] == ["rejected", "rejected"]
+
+    approved = client.post("/api/v1/admin/withdrawals/batch/approve", json={"ids": [ids[1], ids[2], ids[3], 9999]}, headers=admin_headers).json()
+    assert approved == [
+        {"id": ids[1], "ok": False, "status": "rejected", "error": "Only pending requests can be approved"},
+        {"id": ids[2], "ok": True, "status": "approved", "error": None},
+        {"id": ids[3], "ok": True, "status": "approved", "error": None},
+        {"id": 9999, "ok": False, "status": None, "error": "Withdrawal request not found"},
+    ]
+
+    missing_hash = client.post("/api/v1/admin/withdrawals/batch/complete", json={"items": [{"id": ids[2]}]}, headers=admin_headers)
+    assert missing_hash.status_code == 422
+
+    items = [{"id": withdrawal_id, "tx_hash": f"0x{withdrawal_id}"} for withdrawal_id in ids[2:]]
+    completed = client.post("/api/v1/admin/withdrawals/batch/complete", json={"items": items}, headers=admin_headers).json()
+    assert all(r["ok"] and r["status"] == "completed" for r in completed)
+    queue = {w["id"]: w for w in client.get("/api/v1/admin/withdrawals", headers=admin_headers).json()}
+    assert [queue[withdrawal_id]["tx_hash"] for withdrawal_id in ids[2:]] == [f"0x{ids[2]}", f"0x{ids[3]}"]
+
+    balances = {b["coin"]: Decimal(b["amount"]) for b in client.get("/api/v1/wallet/balances", headers=headers).json()}
+    assert balances["BTC"].quantize(Decimal("1e-8")) == Decimal("0.8")
+    ledger = client.get("/api/v1/admin/transactions", params={"type": "withdrawal"}, headers=admin_headers).json()
+    assert sorted(tx["status"] for tx in ledger) == ["completed", "completed", "rejected", "rejected"]
+
+
+def test_cached_user_is_invalidated_by_profile_changes(client: TestClient):
+    _register(client, "cached@example.com", "CachedPass1", "cached")
+    headers = _auth_headers(_login_token(client, "cached@example.com", "CachedPass1"))
+
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+    hits = user_cache.hits
+    assert client.get("/api/v1/wallet/balances", headers=headers).status_code == 200
+    assert user_cache.hits == hits + 1
+
+    # A change made through a cached principal is persisted.
+    updated = client.patch("/api/v1/users/me", json={"phone": "+15550100"}, headers=headers)
+    assert updated.status_code == 200, updated.text
+    assert client.get("/api/v1/users/me", headers=headers).json()["phone"] == "+15550100"
+
+    # Tokens carry the email as subject, so renaming it must drop the old cache entry.
+    assert client.patch("/api/v1/users/me", json={"email": "renamed@example.com"}, headers=headers).status_code == 200
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 401
+
+
+def test_login_rehashes_legacy_bcrypt_hash(client: TestClient):
+    _register(client, "admin@example.com", "AdminPass1", "admin")
+    _register(client, "legacy@example.com", "LegacyPass1", "legacy")
+    _promote_user_to_admin("admin@example.com")
+    admin_headers = _auth_headers(_login_token(client, "admin@example.com", "AdminPass1"))
+
+    async def set_legacy_hash():
+        async for session in app.dependency_overrides[get_db]():
+            user = (await session.execute(select(User).where(User.email == "legacy@example.com"))).scalar_one()
+            user.hashed_password = pwd_context.handler("bcrypt").hash("LegacyPass1")
+            await session.commit()
+
+    import asyncio
+
+    asyncio.run(set_legacy_hash())
+    report = client.get("/api/v1/admin/password_hashes", headers=admin_headers).json()
+    assert report["schemes"]["bcrypt"]["count"] == 1
+    assert report["needs_rehash"] == 1
+
+    # The rehash runs as a background task after the response, which TestClient waits for.
+    _login_token(client, "legacy@example.com", "LegacyPass1")
+    report = client.get("/api/v1/admin/password_hashes", headers=admin_headers).json()
+    assert "bcrypt" not in report["schemes"]
+    assert report["needs_rehash"] == 0
+    assert report["schemes"]["pbkdf2_sha256"]["rounds"] == {str(report["target"]["rounds"]): 2}
+    _login_token(client, "legacy@example.com", "LegacyPass1")
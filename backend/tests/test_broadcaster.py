@@ -0,0 +1,223 @@
+import asyncio
+import sys
+from decimal import Decimal
+from types import SimpleNamespace
+
+from App.services.book_feed import CLOSED, RESYNC, BookFeed
+from App.services.broadcaster import Broadcaster
+from App.services import event_bus as event_bus_module
+from App.services.event_bus import LocalEventBus, PostgresEventBus, _asyncpg_dsn
+from App.services.order_book import OrderBook, order_books
+from App.services.trading_engine import SimpleOrder
+
+
+class FakeWebSocket:
+    def __init__(self, blocked: bool = False):
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+        self.unblock = asyncio.Event()
+        if not blocked:
+            self.unblock.set()
+
+    async def send_text(self, message: str) -> None:
+        await self.unblock.wait()
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+def test_slow_client_is_disconnected_without_stalling_others():
+    async def scenario():
+        broadcaster = Broadcaster(max_queue=2)
+        fast, slow = FakeWebSocket(), FakeWebSocket(blocked=True)
+        broadcaster.connect(fast)
+        broadcaster.connect(slow)
+
+        for n in range(4):
+            broadcaster.publish({"n": n})
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert fast.sent == ['{"n":0}', '{"n":1}', '{"n":2}', '{"n":3}']
+        assert slow.closed_with == 1013
+        stats = broadcaster.stats()
+        assert (stats["connections"], stats["published"], stats["dropped"], stats["disconnected_slow"]) == (1, 4, 1, 1)
+        await broadcaster.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_slow_client_loses_events_when_not_disconnecting():
+    async def scenario():
+        broadcaster = Broadcaster(max_queue=1, disconnect_slow=False)
+        slow = FakeWebSocket(blocked=True)
+        broadcaster.connect(slow)
+
+        broadcaster.publish({"n": 0})
+        await asyncio.sleep(0)
+        for n in range(1, 4):
+            broadcaster.publish({"n": n})
+        slow.unblock.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        # The drain task took n=0 before blocking, n=1 sat in the queue, the rest were dropped.
+        assert slow.sent == ['{"n":0}', '{"n":1}']
+        assert broadcaster.stats()["dropped"] == 2
+        await broadcaster.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_book_feed_replaces_an_overflowing_backlog_with_a_resync():
+    async def scenario():
+        feed = BookFeed(max_queue=3)
+        book = OrderBook("BTCUSDT")
+        order_books._books["BTCUSDT"] = book
+        try:
+            slow = feed.subscribe("BTCUSDT")
+            assert slow.get_nowait() is RESYNC
+            feed.snapshot("BTCUSDT")
+
+            for n in range(4):
+                book.add(SimpleOrder(id=n + 1, user_id=1, side="buy", price=Decimal(100 + n), amount=Decimal("1"), created_at_ts=float(n)))
+                feed.publish("BTCUSDT")
+            # The fourth diff overflowed the queue of three: the backlog became one resync.
+            assert slow.qsize() == 1 and slow.get_nowait() is RESYNC
+            assert feed.resynced == 1
+
+            # A queued CLOSED survives an overflow, so the sender still stops.
+            for item in ("diff", CLOSED, "late diff", "later diff"):
+                feed.push(slow, item)
+            assert slow.qsize() == 1 and slow.get_nowait() is CLOSED
+            assert feed.resynced == 1
+        finally:
+            order_books.clear()
+
+    asyncio.run(scenario())
+
+
+def test_event_bus_dispatches_to_every_handler_despite_failures():
+    async def scenario():
+        bus = LocalEventBus()
+        received: list[dict] = []
+
+        def broken(event: dict) -> None:
+            raise RuntimeError("boom")
+
+        bus.subscribe(broken)
+        bus.subscribe(received.append)
+        await bus.publish({"type": "trade"})
+        assert received == [{"type": "trade"}]
+
+    asyncio.run(scenario())
+
+
+def test_postgres_event_bus_dsn_drops_the_sqlalchemy_driver():
+    assert _asyncpg_dsn("postgresql+asyncpg://u:p@db:5432/exchange") == "postgresql://u:p@db:5432/exchange"
+    assert _asyncpg_dsn("postgresql://u:p@db/exchange") == "postgresql://u:p@db/exchange"
+
+
+class FakePgServer:
+    """Stands in for asyncpg: connections share one server that fans NOTIFY out to listeners."""
+
+    def __init__(self):
+        self.connections: list["FakePgConnection"] = []
+        self.down = False
+
+    async def connect(self, dsn: str) -> "FakePgConnection":
+        if self.down:
+            raise ConnectionRefusedError("database is down")
+        connection = FakePgConnection(self)
+        self.connections.append(connection)
+        return connection
+
+
+class FakePgConnection:
+    def __init__(self, server: FakePgServer):
+        self.server = server
+        self.closed = False
+        self.listeners: dict[str, object] = {}
+        self.on_terminated: list = []
+
+    def add_termination_listener(self, callback) -> None:
+        self.on_terminated.append(callback)
+
+    async def add_listener(self, channel: str, callback) -> None:
+        self.listeners[channel] = callback
+
+    async def execute(self, query: str, channel: str, payload: str) -> None:
+        if self.closed:
+            raise ConnectionResetError("connection is closed")
+        for connection in self.server.connections:
+            if not connection.closed and channel in connection.listeners:
+                connection.listeners[channel](connection, 1, channel, payload)
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def terminate(self) -> None:
+        self.closed = True
+        for callback in self.on_terminated:
+            callback(self)
+
+    async def close(self) -> None:
+        self.terminate()
+
+
+def _postgres_bus(monkeypatch) -> tuple[PostgresEventBus, FakePgServer, list[dict]]:
+    server = FakePgServer()
+    monkeypatch.setitem(sys.modules, "asyncpg", SimpleNamespace(connect=server.connect))
+    monkeypatch.setattr(event_bus_module, "RECONNECT_DELAY_SECONDS", 0)
+    bus = PostgresEventBus("postgresql://fake/db", "events")
+    received: list[dict] = []
+    bus.subscribe(received.append)
+    return bus, server, received
+
+
+async def _settle(bus: PostgresEventBus) -> None:
+    while bus._reconnect_task is not None and not bus._reconnect_task.done():
+        await asyncio.sleep(0)
+
+
+def test_postgres_event_bus_publishes_through_notify(monkeypatch):
+    async def scenario():
+        bus, server, received = _postgres_bus(monkeypatch)
+        await bus.start()
+        await bus.publish({"type": "trade", "n": 1})
+        bus._on_notify(None, 1, "events", "not json")
+        await bus.stop()
+        assert received == [{"type": "trade", "n": 1}]
+        assert all(c.closed for c in server.connections)
+
+    asyncio.run(scenario())
+
+
+def test_postgres_event_bus_reconnects_when_notify_connection_fails(monkeypatch):
+    async def scenario():
+        bus, server, received = _postgres_bus(monkeypatch)
+        await bus.start()
+
+        # The notify connection dies silently; the publish falls back locally and reconnects.
+        bus._notify_conn.closed = True
+        server.down = True
+        await bus.publish({"n": 1})
+        assert received == [{"n": 1}]
+        for _ in range(3):
+            await asyncio.sleep(0)
+        server.down = False
+        await _settle(bus)
+
+        await bus.publish({"n": 2})
+        assert received == [{"n": 1}, {"n": 2}]
+
+        # Losing the notify connection outright also reconnects.
+        bus._notify_conn.terminate()
+        await _settle(bus)
+        await bus.publish({"n": 3})
+        assert received[-1] == {"n": 3}
+        assert sum(not c.closed for c in server.connections) == 2
+        await bus.stop()
+
+    asyncio.run(scenario())
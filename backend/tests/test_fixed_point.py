@@ -0,0 +1,111 @@
+import asyncio
+import random
+from dataclasses import replace
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from App.core.config import settings
+from App.models.order import Order
+from App.services.fixed_point import FixedPointScale, scale_for
+from App.services.order_book import OrderBook, load_order_book
+from App.services.trading_engine import MatchExecution, SimpleOrder, settle_trade
+
+SCALES = [
+    FixedPointScale(tick=Decimal("0.01"), lot=Decimal("0.000001")),
+    FixedPointScale(tick=Decimal("0.05"), lot=Decimal("0.001")),
+    FixedPointScale(tick=Decimal("1"), lot=Decimal("0.00000001")),
+]
+FEE_RATES = [Decimal("0.001"), Decimal("0.0025"), Decimal("0.00075"), Decimal("0")]
+
+
+def _random_orders(rng: random.Random, scale: FixedPointScale, count: int) -> list[SimpleOrder]:
+    orders = []
+    for i in range(count):
+        price = scale.tick * rng.randint(1900, 2100)
+        amount = scale.lot * rng.randint(1, 5_000)
+        orders.append(SimpleOrder(id=i + 1, user_id=i, side=rng.choice(["buy", "sell"]), price=price, amount=amount, created_at_ts=float(i)))
+    return orders
+
+
+@pytest.mark.parametrize("scale", SCALES)
+def test_scaled_book_matches_decimal_book(scale: FixedPointScale):
+    rng = random.Random(1234)
+    for _ in range(50):
+        orders = _random_orders(rng, scale, 60)
+        decimal_book = OrderBook("BTCUSDT")
+        scaled_book = OrderBook("BTCUSDT", scale)
+
+        decimal_fills = []
+        scaled_fills = []
+        for order in orders:
+            decimal_fills += decimal_book.submit(replace(order))
+            scaled_fills += scaled_book.submit(replace(order))
+
+        assert [
+            MatchExecution(m.buy_order_id, m.sell_order_id, scale.price_from_units(m.price), scale.amount_from_units(m.amount))
+            for m in scaled_fills
+        ] == decimal_fills
+        assert scaled_book.best_bid() == decimal_book.best_bid()
+        assert scaled_book.best_ask() == decimal_book.best_ask()
+        for order in orders:
+            scaled = scaled_book.get(order.id)
+            plain = decimal_book.get(order.id)
+            assert (scaled is None) == (plain is None)
+            if plain is not None:
+                assert scaled_book.amount_out(scaled.amount) == plain.amount
+
+
+@pytest.mark.parametrize("scale", SCALES)
+def test_integer_settlement_matches_decimal_settlement(scale: FixedPointScale):
+    rng = random.Random(99)
+    for _ in range(500):
+        price = scale.tick * rng.randint(1, 10_000_000)
+        amount = scale.lot * rng.randint(1, 10_000_000)
+        fee_rate = rng.choice(FEE_RATES)
+
+        assert scale.settle(price, amount, fee_rate) == settle_trade(price, amount, fee_rate)
+
+
+def test_off_grid_values_are_rejected():
+    scale = FixedPointScale(tick=Decimal("0.01"), lot=Decimal("0.001"))
+
+    assert scale.fits(Decimal("100.25"), Decimal("0.5"))
+    assert not scale.fits(Decimal("100.255"), Decimal("0.5"))
+    with pytest.raises(ValueError):
+        scale.amount_to_units(Decimal("0.0005"))
+    with pytest.raises(ValueError):
+        OrderBook("BTCUSDT", scale).add(
+            SimpleOrder(id=1, user_id=1, side="buy", price=Decimal("100.001"), amount=Decimal("1"), created_at_ts=0.0)
+        )
+
+
+class _Rows:
+    def __init__(self, orders):
+        self.orders = orders
+
+    async def execute(self, _stmt):
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.orders))
+
+
+def _open_order(order_id: int, side: str, price: str, amount: str) -> Order:
+    return Order(
+        id=order_id, user_id=order_id, symbol="BTCUSDT", side=side, price=Decimal(price), amount=Decimal(amount),
+        status="open", created_at=datetime(2024, 1, 1, 0, 0, order_id, tzinfo=timezone.utc),
+    )
+
+
+def test_off_grid_legacy_orders_fall_back_to_decimal_book(monkeypatch):
+    monkeypatch.setattr(settings, "MATCHING_FIXED_POINT", True)
+
+    on_grid = [_open_order(1, "buy", "100.25", "0.5"), _open_order(2, "sell", "101", "0.25")]
+    book = asyncio.run(load_order_book(_Rows(on_grid), "BTCUSDT"))
+    assert book.scale == scale_for("BTCUSDT")
+
+    legacy = on_grid + [_open_order(3, "sell", "101", "0.0000005")]
+    book = asyncio.run(load_order_book(_Rows(legacy), "BTCUSDT"))
+    assert book.scale is None
+    assert book.best_ask() == Decimal("101")
+    assert book.snapshot()["asks"] == [{"price": "101", "amount": "0.2500005", "orders": 2}]
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+from App.core.security import get_password_hash
+from App.services.password_hasher import PasswordHasher
+
+
+def test_hashing_runs_off_the_event_loop():
+    async def scenario():
+        hasher = PasswordHasher(workers=2)
+        hashed = get_password_hash("SecurePass1")
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        beat = asyncio.create_task(heartbeat())
+        results = await asyncio.gather(*(hasher.verify("SecurePass1", hashed) for _ in range(4)), hasher.verify("wrong", hashed))
+        beat.cancel()
+
+        assert results == [True, True, True, True, False]
+        assert ticks > 1, "the loop should keep running while hashes are computed"
+        stats = hasher.stats()
+        assert stats["pending"] == 0
+        assert stats["hashing"]["count"] == 5
+        assert stats["queue_wait"]["count"] == 5
+        hasher.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_queue_wait_is_recorded_when_workers_are_busy():
+    async def scenario():
+        hasher = PasswordHasher(workers=1)
+        release = threading.Event()
+
+        async def slow() -> None:
+            await hasher._submit(release.wait, 5)
+
+        blocker = asyncio.create_task(slow())
+        waiting = asyncio.create_task(hasher._submit(time.sleep, 0))
+        await asyncio.sleep(0.05)
+        assert hasher.stats()["pending"] == 2
+        release.set()
+        await asyncio.gather(blocker, waiting)
+
+        assert hasher.queue_wait.max_seconds >= 0.04
+        hasher.shutdown()
+
+    asyncio.run(scenario())
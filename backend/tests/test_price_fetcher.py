@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+
+from App.services.price_fetcher import PriceFetcher
+
+
+def _stub(responses: list[httpx.Response], calls: list[httpx.Request]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    return httpx.MockTransport(handler)
+
+
+def test_concurrent_readers_share_one_upstream_fetch():
+    async def scenario():
+        calls: list[httpx.Request] = []
+        transport = _stub([httpx.Response(200, json={"bitcoin": {"usd": 30000.5}, "tether": {"usd": 1.0}})], calls)
+        fetcher = PriceFetcher("http://prices.test/simple/price", interval=60, transport=transport)
+
+        snapshots = await asyncio.gather(*(fetcher.latest() for _ in range(20)))
+        await asyncio.sleep(0)
+
+        assert len(calls) == 1
+        assert calls[0].url.params["vs_currencies"] == "usd"
+        assert all(s is snapshots[0] for s in snapshots)
+        assert snapshots[0].prices["BTC"] == 30000.5
+        assert snapshots[0].prices["ETH"] is None
+        assert not fetcher.is_stale()
+        await fetcher.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_keeps_last_good_snapshot():
+    async def scenario():
+        calls: list[httpx.Request] = []
+        transport = _stub([httpx.Response(200, json={"bitcoin": {"usd": 100}}), httpx.Response(429)], calls)
+        fetcher = PriceFetcher("http://prices.test/simple/price", interval=60, transport=transport)
+
+        first = await fetcher.refresh()
+        second = await fetcher.refresh()
+
+        assert second is first
+        assert first.prices["BTC"] == 100
+        assert fetcher.last_error is not None and "429" in fetcher.last_error
+        await fetcher.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from App.middleware.rate_limiter import AuthRateLimiter, LimitWindow, MemoryRateLimitStore, SQLiteRateLimitStore
+
+WINDOW = LimitWindow(max_requests=3, window_seconds=60)
+
+
+def _hits(store, key, times):
+    return [store.hit(key, WINDOW, t) for t in times]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryRateLimitStore(max_keys=100)
+    return SQLiteRateLimitStore(str(tmp_path / "limits.sqlite3"), max_keys=100)
+
+
+def test_sliding_window_weights_the_previous_window(store):
+    key = ("10.0.0.1", "login")
+    assert _hits(store, key, [110, 115, 119, 119.5]) == [True, True, True, False]
+    # 30s into the next window, half of the previous window's 3 requests still count (1.5 + current).
+    assert _hits(store, key, [150, 151, 152]) == [True, True, False]
+    # Two windows later everything has aged out.
+    assert _hits(store, key, [245, 246, 247, 248]) == [True, True, True, False]
+
+
+def test_keys_are_limited_independently(store):
+    assert _hits(store, ("a", "login"), [0, 1, 2, 3]) == [True, True, True, False]
+    assert _hits(store, ("b", "login"), [3]) == [True]
+    assert _hits(store, ("a", "register"), [3]) == [True]
+
+
+def test_memory_store_is_bounded_and_drops_idle_keys():
+    store = MemoryRateLimitStore(max_keys=50)
+    for n in range(1000):
+        store.hit((f"10.0.{n // 256}.{n % 256}", "login"), WINDOW, 10)
+    assert len(store) == 50
+
+    store.hit(("late", "login"), WINDOW, 10 + 2 * WINDOW.window_seconds)
+    assert len(store) == 1
+
+
+def test_sqlite_store_is_shared_and_swept(tmp_path):
+    path = str(tmp_path / "limits.sqlite3")
+    first = SQLiteRateLimitStore(path, max_keys=5, sweep_every=4)
+    second = SQLiteRateLimitStore(path, max_keys=5, sweep_every=4)
+    key = ("10.0.0.1", "login")
+    assert _hits(first, key, [0, 1]) + _hits(second, key, [2, 3]) == [True, True, True, False]
+
+    for n in range(6):
+        first.hit((f"scan-{n}", "login"), WINDOW, 4)
+    assert len(first) <= 5
+
+
+def test_limiter_raises_429_when_exhausted(store):
+    limiter = AuthRateLimiter(login_window=LimitWindow(2, 60), register_window=WINDOW, store=store)
+
+    async def attempts(n):
+        for _ in range(n):
+            await limiter.check("1.2.3.4", "login")
+
+    asyncio.run(attempts(2))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(attempts(1))
+    assert exc.value.status_code == 429
+    limiter.clear()
+    asyncio.run(attempts(1))
+
+
+def test_sqlite_checks_run_off_the_event_loop(tmp_path):
+    store = SQLiteRateLimitStore(str(tmp_path / "limits.sqlite3"), max_keys=10)
+    limiter = AuthRateLimiter(login_window=WINDOW, register_window=WINDOW, store=store)
+    threads = []
+    hit = store.hit
+    store.hit = lambda *args: threads.append(threading.get_ident()) or hit(*args)
+
+    async def check():
+        await limiter.check("1.2.3.4", "login")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(check())
+    assert threads and threads[0] != loop_thread
@@ -1,6 +1,17 @@
+import time
+from datetime import timedelta
+
 from fastapi import HTTPException
+from jose import jwt
 
-from App.core.security import get_password_hash, validate_password_strength, verify_password
+from App.core.security import (
+    create_access_token,
+    decode_access_token,
+    get_password_hash,
+    validate_password_strength,
+    verified_tokens,
+    verify_password,
+)
 
 
 def test_password_hash_and_verify_over_72_chars() -> None:
@@ -22,3 +33,31 @@ def test_password_strength_rejects_too_long() -> None:
 
 def test_verify_password_handles_invalid_hash_gracefully() -> None:
     assert verify_password("SecurePass1", "not-a-real-hash") is False
+
+
+def test_decode_access_token_caches_until_expiry(monkeypatch) -> None:
+    verified_tokens.clear()
+    token = create_access_token({"sub": "cached@example.com"}, expires_delta=timedelta(seconds=60))
+    claims = decode_access_token(token)
+    assert claims["sub"] == "cached@example.com"
+
+    calls = []
+    monkeypatch.setattr(jwt, "decode", lambda *args, **kwargs: calls.append(args) or {})
+    cached = decode_access_token(token)
+    assert cached == claims and not calls
+    cached["sub"] = "mutated"
+    assert decode_access_token(token)["sub"] == "cached@example.com"
+
+    # Past exp the entry is dropped and the token goes back through full verification.
+    monkeypatch.setattr(time, "time", lambda: claims["exp"] + 1)
+    decode_access_token(token)
+    assert len(calls) == 1
+
+
+def test_decode_access_token_does_not_cache_bad_signatures() -> None:
+    verified_tokens.clear()
+    token = create_access_token({"sub": "x@example.com"})
+    forged = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+    assert decode_access_token(forged) is None
+    assert decode_access_token(forged) is None
+    assert decode_access_token(token)["sub"] == "x@example.com"
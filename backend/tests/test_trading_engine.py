@@ -1,6 +1,9 @@
+import asyncio
 from decimal import Decimal
 
 from App.services.fee_handler import calculate_trading_fee
+from App.services.order_book import OrderBook
+from App.services.sequencer import MatchingSequencer
 from App.services.trading_engine import SimpleOrder, match_orders, settle_trade
 
 
@@ -40,3 +43,147 @@ def test_settlement_applies_fees_to_received_amount():
     assert result.buyer_quote_delta == Decimal("-100")
     assert result.seller_base_delta == Decimal("-1")
     assert result.seller_quote_delta == Decimal("99.900000000000000000")
+
+
+def _book_with(*orders: SimpleOrder) -> OrderBook:
+    book = OrderBook("BTCUSDT")
+    for order in orders:
+        book.add(order)
+    return book
+
+
+def test_order_book_matches_like_match_orders():
+    def orders():
+        return [
+            SimpleOrder(id=1, user_id=100, side="buy", price=Decimal("100"), amount=Decimal("1"), created_at_ts=2.0),
+            SimpleOrder(id=2, user_id=101, side="buy", price=Decimal("101"), amount=Decimal("1"), created_at_ts=1.0),
+            SimpleOrder(id=3, user_id=200, side="sell", price=Decimal("100"), amount=Decimal("0.4"), created_at_ts=1.0),
+            SimpleOrder(id=4, user_id=201, side="sell", price=Decimal("100"), amount=Decimal("1.0"), created_at_ts=2.0),
+            SimpleOrder(id=5, user_id=202, side="sell", price=Decimal("102"), amount=Decimal("1.0"), created_at_ts=0.5),
+        ]
+
+    expected = match_orders([o for o in orders() if o.side == "buy"], [o for o in orders() if o.side == "sell"])
+    book = _book_with(*orders())
+
+    assert book.match() == expected
+    assert book.best_bid() == Decimal("100")
+    assert book.get(1).amount == Decimal("0.6")
+    assert book.best_ask() == Decimal("102")
+    assert book.match() == []
+
+
+def test_order_book_cancel_and_sync_restore_time_priority():
+    first = SimpleOrder(id=1, user_id=100, side="sell", price=Decimal("100"), amount=Decimal("1"), created_at_ts=1.0)
+    second = SimpleOrder(id=2, user_id=101, side="sell", price=Decimal("100"), amount=Decimal("1"), created_at_ts=2.0)
+    book = _book_with(first, second)
+
+    assert book.remove(1) is first
+    assert 1 not in book
+    assert book.remove(1) is None
+
+    book.sync(SimpleOrder(id=1, user_id=100, side="sell", price=Decimal("100"), amount=Decimal("0.5"), created_at_ts=1.0), True)
+    book.add(SimpleOrder(id=3, user_id=300, side="buy", price=Decimal("100"), amount=Decimal("0.7"), created_at_ts=3.0))
+    matches = book.match()
+
+    assert [(m.sell_order_id, m.amount) for m in matches] == [(1, Decimal("0.5")), (2, Decimal("0.2"))]
+    assert book.get(2).amount == Decimal("0.8")
+
+    book.sync(book.get(2), False)
+    assert len(book) == 0
+    assert book.best_ask() is None
+
+
+def test_order_book_compacts_levels_under_cancel_churn():
+    head = SimpleOrder(id=1, user_id=100, side="sell", price=Decimal("100"), amount=Decimal("1"), created_at_ts=0.0)
+    book = _book_with(head)
+    for n in range(2, 10_002):
+        book.add(SimpleOrder(id=n, user_id=101, side="sell", price=Decimal("100"), amount=Decimal("1"), created_at_ts=float(n)))
+        book.remove(n)
+
+    level = book._levels["sell"][Decimal("100")]
+    assert level.count == 1
+    assert len(level.orders) <= 2
+    assert book.depth("sell") == [(Decimal("100"), Decimal("1"), 1)]
+
+
+def test_order_book_submit_trades_at_resting_price():
+    book = _book_with(
+        SimpleOrder(id=1, user_id=100, side="buy", price=Decimal("101"), amount=Decimal("1"), created_at_ts=1.0),
+        SimpleOrder(id=2, user_id=101, side="buy", price=Decimal("100"), amount=Decimal("1"), created_at_ts=2.0),
+    )
+
+    fills = book.submit(SimpleOrder(id=3, user_id=200, side="sell", price=Decimal("99"), amount=Decimal("1.5"), created_at_ts=3.0))
+
+    assert [(m.buy_order_id, m.price, m.amount) for m in fills] == [
+        (1, Decimal("101"), Decimal("1")),
+        (2, Decimal("100"), Decimal("0.5")),
+    ]
+    assert 3 not in book
+    assert book.get(2).amount == Decimal("0.5")
+
+
+def test_order_book_submit_only_matches_the_incoming_order():
+    # A settlement skip can leave the book crossed; a new order must not trade the stale pair.
+    book = _book_with(
+        SimpleOrder(id=1, user_id=100, side="buy", price=Decimal("101"), amount=Decimal("1"), created_at_ts=1.0),
+        SimpleOrder(id=2, user_id=101, side="sell", price=Decimal("100"), amount=Decimal("1"), created_at_ts=2.0),
+    )
+
+    assert book.submit(SimpleOrder(id=3, user_id=200, side="buy", price=Decimal("99"), amount=Decimal("1"), created_at_ts=3.0)) == []
+    fills = book.submit(SimpleOrder(id=4, user_id=201, side="sell", price=Decimal("101"), amount=Decimal("1"), created_at_ts=4.0))
+
+    assert [(m.buy_order_id, m.sell_order_id, m.price) for m in fills] == [(1, 4, Decimal("101"))]
+    assert 2 in book and 3 in book
+
+
+def test_order_book_depth_aggregates_levels_and_caches_snapshots():
+    book = _book_with(
+        SimpleOrder(id=1, user_id=100, side="buy", price=Decimal("100"), amount=Decimal("1"), created_at_ts=1.0),
+        SimpleOrder(id=2, user_id=101, side="buy", price=Decimal("100"), amount=Decimal("0.5"), created_at_ts=2.0),
+        SimpleOrder(id=3, user_id=102, side="buy", price=Decimal("99"), amount=Decimal("2"), created_at_ts=3.0),
+        SimpleOrder(id=4, user_id=103, side="sell", price=Decimal("101"), amount=Decimal("1"), created_at_ts=4.0),
+    )
+
+    snapshot = book.snapshot(depth=1)
+    assert snapshot == {"bids": [{"price": "100", "amount": "1.5", "orders": 2}], "asks": [{"price": "101", "amount": "1", "orders": 1}]}
+    assert book.snapshot(depth=1) is snapshot
+
+    book.submit(SimpleOrder(id=5, user_id=200, side="sell", price=Decimal("100"), amount=Decimal("1.2"), created_at_ts=5.0))
+    book.remove(3)
+    book.sync(SimpleOrder(id=4, user_id=103, side="sell", price=Decimal("101"), amount=Decimal("0.4"), created_at_ts=4.0), is_open=True)
+
+    assert book.snapshot(depth=5) == {
+        "bids": [{"price": "100", "amount": "0.3", "orders": 1}],
+        "asks": [{"price": "101", "amount": "0.4", "orders": 1}],
+    }
+
+
+def test_sequencer_orders_commands_per_symbol_and_runs_symbols_concurrently():
+    async def scenario():
+        sequencer = MatchingSequencer()
+        applied: list[str] = []
+        eth_started = asyncio.Event()
+
+        async def command(label: str, wait_for_eth: bool = False) -> str:
+            if wait_for_eth:
+                # Would deadlock if ETHUSDT were queued behind BTCUSDT.
+                await eth_started.wait()
+            applied.append(label)
+            return label
+
+        async def eth_command() -> str:
+            eth_started.set()
+            return "eth"
+
+        btc = [asyncio.create_task(sequencer.submit("BTCUSDT", lambda i=i: command(f"btc-{i}", wait_for_eth=i == 0), "place")) for i in range(3)]
+        eth = asyncio.create_task(sequencer.submit("ETHUSDT", eth_command, "place"))
+
+        assert await asyncio.gather(*btc, eth) == ["btc-0", "btc-1", "btc-2", "eth"]
+        assert applied == ["btc-0", "btc-1", "btc-2"]
+
+        stats = sequencer.stats()
+        assert stats["BTCUSDT"]["queue_depth"] == 0
+        assert stats["BTCUSDT"]["commands"]["place"]["count"] == 3
+        await sequencer.shutdown()
+
+    asyncio.run(scenario())
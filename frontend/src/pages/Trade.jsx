@@ -101,13 +101,13 @@ export default function Trade() {
               <div className="card-sub">
                 <h5>Bids</h5>
                 <ul className="compact-list">
-                  {orderbook.bids?.map((b) => <li key={`b-${b.id}`}>#{b.id} · {b.amount} @ {b.price}</li>)}
+                  {orderbook.bids?.map((b) => <li key={`b-${b.price}`}>{b.amount} @ {b.price} · {b.orders} orders</li>)}
                 </ul>
               </div>
               <div className="card-sub">
                 <h5>Asks</h5>
                 <ul className="compact-list">
-                  {orderbook.asks?.map((a) => <li key={`a-${a.id}`}>#{a.id} · {a.amount} @ {a.price}</li>)}
+                  {orderbook.asks?.map((a) => <li key={`a-${a.price}`}>{a.amount} @ {a.price} · {a.orders} orders</li>)}
                 </ul>
               </div>
             </div>